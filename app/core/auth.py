@@ -7,12 +7,15 @@ import json
 import os
 import secrets
 import time
-from typing import Mapping, Optional
+from typing import Iterable, Mapping, Optional
 
 from fastapi import HTTPException, Request, Response, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from fastapi.security.utils import get_authorization_scheme_param
+from starlette.requests import cookie_parser
 
 from app.core.config import get_config
+from app.core.exceptions import http_exception_handler
 from app.services.api_keys import api_key_manager
 
 DEFAULT_API_KEY = ""
@@ -25,6 +28,9 @@ PUBLIC_SESSION_COOKIE = "grok2api_public_session"
 DEFAULT_ADMIN_SESSION_TTL_HOURS = 24
 DEFAULT_PUBLIC_SESSION_TTL_HOURS = 24
 
+# Scope state key set by ApiKeyAsgiMiddleware once a request is authenticated.
+API_KEY_AUTH_STATE = "api_key_auth"
+
 security = HTTPBearer(
     auto_error=False,
     scheme_name="API Key",
@@ -262,20 +268,16 @@ def has_public_access(
     return _constant_time_equals(str(raw_key or ""), public_key)
 
 
-async def verify_api_key(
-    request: Request,
-    auth: Optional[HTTPAuthorizationCredentials] = Security(security),
+async def authenticate_api_key(
+    provided: str, has_auth: bool, cookies: Optional[Mapping[str, str]]
 ) -> Optional[str]:
-    provided = auth.credentials if auth else ""
-
+    """Check OpenAI-compatible endpoint access; raises HTTPException on failure."""
     # Web UI session cookies can access OpenAI-compatible endpoints.
-    if has_valid_admin_session(request.cookies) or has_valid_public_session(
-        request.cookies
-    ):
+    if has_valid_admin_session(cookies) or has_valid_public_session(cookies):
         return "session"
 
     # Public mode can also access OpenAI-compatible endpoints.
-    if has_public_access(provided, request.cookies):
+    if has_public_access(provided, cookies):
         return provided or "public"
 
     api_key = get_admin_api_key()
@@ -284,7 +286,7 @@ async def verify_api_key(
     if not api_key and not has_keys:
         return None
 
-    if not auth:
+    if not has_auth:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Missing authentication token",
@@ -305,6 +307,78 @@ async def verify_api_key(
     return provided
 
 
+async def verify_api_key(
+    request: Request,
+    auth: Optional[HTTPAuthorizationCredentials] = Security(security),
+) -> Optional[str]:
+    # ApiKeyAsgiMiddleware already authenticated this request.
+    state = request.scope.get("state")
+    if state and API_KEY_AUTH_STATE in state:
+        return state[API_KEY_AUTH_STATE]
+
+    provided = auth.credentials if auth else ""
+    return await authenticate_api_key(provided, auth is not None, request.cookies)
+
+
+class ApiKeyAsgiMiddleware:
+    """ASGI-level API key gate for OpenAI-compatible endpoints.
+
+    Runs the same checks as verify_api_key, but reads the bearer token and
+    cookies straight from the ASGI scope and answers 401 before routing and
+    dependency resolution for the route paths in ``protected_paths``
+    (matched after stripping ``root_path``). A successful result is stored in
+    the scope state so the verify_api_key dependency, which stays on the
+    routes as a backstop, does not authenticate the request twice.
+    """
+
+    def __init__(self, app, protected_paths: Iterable[str] = ()):
+        self.app = app
+        self.protected_paths = frozenset(protected_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # Match on the route path, as the router does behind a proxy prefix.
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        if path not in self.protected_paths:
+            return await self.app(scope, receive, send)
+
+        authorization = cookie_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                authorization = value.decode("latin-1")
+            elif name == b"cookie":
+                cookie_header = value.decode("latin-1")
+
+        # Same parsing as HTTPBearer(auto_error=False).
+        scheme, credentials = get_authorization_scheme_param(authorization)
+        has_auth = bool(authorization and credentials and scheme.lower() == "bearer")
+        cookies = cookie_parser(cookie_header) if cookie_header else {}
+
+        try:
+            result = await authenticate_api_key(
+                credentials if has_auth else "", has_auth, cookies
+            )
+        except HTTPException as exc:
+            response = await http_exception_handler(Request(scope), exc)
+            await response(scope, receive, send)
+            return
+        except Exception:
+            # Leave unexpected errors to the verify_api_key dependency, where
+            # the registered exception handlers apply.
+            verified = False
+        else:
+            verified = True
+
+        if verified:
+            scope.setdefault("state", {})[API_KEY_AUTH_STATE] = result
+        await self.app(scope, receive, send)
+
+
 async def verify_app_key(
     request: Request,
     auth: Optional[HTTPAuthorizationCredentials] = Security(security),
@@ -378,7 +452,10 @@ async def verify_public_key(
 
 __all__ = [
     "ADMIN_SESSION_COOKIE",
+    "API_KEY_AUTH_STATE",
+    "ApiKeyAsgiMiddleware",
     "PUBLIC_SESSION_COOKIE",
+    "authenticate_api_key",
     "clear_admin_session_cookie",
     "clear_public_session_cookie",
     "get_admin_api_key",
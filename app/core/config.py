@@ -14,6 +14,8 @@ from app.core.logger import logger
 
 DEFAULT_CONFIG_FILE = Path(__file__).parent.parent.parent / "config.defaults.toml"
 
+_MISSING = object()
+
 
 def _deep_merge(base: Dict[str, Any], override: Dict[str, Any]) -> Dict[str, Any]:
     """深度合并字典: override 覆盖 base."""
@@ -168,6 +170,17 @@ def _migrate_deprecated_config(
     return result, deprecated_sections
 
 
+def _flatten_config(data: Dict[str, Any]) -> Dict[str, Any]:
+    """展开为 "section" / "section.key" 到值的平铺索引"""
+    flat = {}
+    for section, section_data in data.items():
+        flat[section] = section_data
+        if isinstance(section_data, dict):
+            for attr, value in section_data.items():
+                flat[f"{section}.{attr}"] = value
+    return flat
+
+
 def _load_defaults() -> Dict[str, Any]:
     """加载默认配置文件"""
     if not DEFAULT_CONFIG_FILE.exists():
@@ -188,9 +201,13 @@ class Config:
 
     def __init__(self):
         self._config = {}
+        # 平铺索引，随 _config 一同在 load/update 时重建，get 只需一次字典查找
+        self._flat = {}
         self._defaults = {}
         self._code_defaults = {}
         self._defaults_loaded = False
+        # 配置版本号，每次 load/update 后递增，供派生缓存判断失效
+        self.version = 0
 
     def register_defaults(self, defaults: Dict[str, Any]):
         """注册代码中定义的默认值"""
@@ -255,10 +272,15 @@ class Config:
                 if deprecated_sections:
                     logger.info("Configuration automatically migrated and cleaned.")
 
-            self._config = merged
+            self._set_config(merged)
         except Exception as e:
             logger.error(f"Error loading config: {e}")
-            self._config = {}
+            self._set_config({})
+        self.version += 1
+
+    def _set_config(self, data: Dict[str, Any]):
+        self._config = data
+        self._flat = _flatten_config(data)
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -268,14 +290,18 @@ class Config:
             key: 配置键，格式 "section.key"
             default: 默认值
         """
-        if "." in key:
-            try:
-                section, attr = key.split(".", 1)
-                return self._config.get(section, {}).get(attr, default)
-            except (ValueError, AttributeError):
-                return default
+        value = self._flat.get(key, _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, *keys: str) -> tuple:
+        """
+        批量获取配置值（缺失项返回 None）
 
-        return self._config.get(key, default)
+        Args:
+            keys: 配置键，格式 "section.key"
+        """
+        flat = self._flat
+        return tuple(flat.get(key) for key in keys)
 
     async def update(self, new_config: dict):
         """更新配置"""
@@ -287,7 +313,8 @@ class Config:
             base = _deep_merge(self._defaults, self._config or {})
             merged = _deep_merge(base, new_config or {})
             await storage.save_config(merged)
-            self._config = merged
+            self._set_config(merged)
+            self.version += 1
 
 
 # 全局配置实例
@@ -299,9 +326,14 @@ def get_config(key: str, default: Any = None) -> Any:
     return config.get(key, default)
 
 
+def get_config_many(*keys: str) -> tuple:
+    """批量获取配置"""
+    return config.get_many(*keys)
+
+
 def register_defaults(defaults: Dict[str, Any]):
     """注册默认配置"""
     config.register_defaults(defaults)
 
 
-__all__ = ["Config", "config", "get_config", "register_defaults"]
+__all__ = ["Config", "config", "get_config", "get_config_many", "register_defaults"]
@@ -2,6 +2,7 @@
 全局异常处理 - OpenAI 兼容错误格式
 """
 
+from collections.abc import Mapping
 from typing import Any
 from enum import Enum
 from fastapi import Request, HTTPException
@@ -87,8 +88,44 @@ class AuthenticationException(AppException):
         )
 
 
+def _safe_float(value: Any) -> float | None:
+    """转换为 float，失败返回 None"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_retry_after(details: dict) -> float | None:
+    """从错误详情中解析 Retry-After（秒）"""
+    retry_after = details.get("retry_after")
+    if retry_after is not None:
+        value = _safe_float(retry_after)
+        if value is not None:
+            return value
+
+    # 大小写不敏感的 Headers 对象（httpx / curl_cffi）首次查找即命中，
+    # 普通 dict 按规范写法优先
+    headers = details.get("headers")
+    if isinstance(headers, Mapping):
+        retry_after = headers.get("Retry-After")
+        if retry_after is None:
+            retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            return _safe_float(retry_after)
+
+    return None
+
+
 class UpstreamException(AppException):
-    """上游服务错误"""
+    """
+    上游服务错误
+
+    status_code 为返回给客户端的状态码（固定 502）；重试判定使用的状态码与
+    Retry-After 在构造时从 details 中提取到 upstream_status / retry_after，
+    重试逻辑直接读取属性即可。details 含 "status" 键时 upstream_status
+    取其值（包括 None），否则为 status_code。
+    """
 
     def __init__(self, message: str, details: Any = None):
         super().__init__(
@@ -98,6 +135,12 @@ class UpstreamException(AppException):
             status_code=502,
         )
         self.details = details
+        if isinstance(details, dict):
+            self.upstream_status: int | None = details.get("status", self.status_code)
+            self.retry_after: float | None = _parse_retry_after(details)
+        else:
+            self.upstream_status = self.status_code
+            self.retry_after = None
 
 
 class StreamIdleTimeoutError(Exception):
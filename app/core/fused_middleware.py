@@ -0,0 +1,206 @@
+"""
+CORS + 请求日志融合中间件
+
+把 CORS 头处理与请求日志/TraceID 合并为一层纯 ASGI 中间件，
+每个请求少一层中间件调用与 send 包装。CORS 行为与 Starlette
+CORSMiddleware（allow_credentials=True）保持一致：预检请求在最外层以
+预编码的响应头直接应答（成功时为 204），普通请求在响应头中回显允许的 Origin；
+不允许的 Origin 不返回任何 CORS 头（仅追加 Vary: Origin）。
+"""
+
+import time
+import uuid
+from typing import Iterable
+
+from app.core.response_middleware import (
+    log_error,
+    log_request,
+    log_response,
+    should_skip_log,
+)
+
+# 始终允许的简单请求头（与 Starlette 一致）
+_SAFELISTED_HEADERS = {"Accept", "Accept-Language", "Content-Language", "Content-Type"}
+
+_ALLOW_CREDENTIALS = (b"access-control-allow-credentials", b"true")
+_TEXT_CONTENT_TYPE = (b"content-type", b"text/plain; charset=utf-8")
+
+_PREFLIGHT_VARY = (
+    "Origin, Access-Control-Request-Method, Access-Control-Request-Headers, "
+    "Access-Control-Request-Private-Network"
+)
+
+
+class FusedCorsLoggingMiddleware:
+    """
+    CORS 与请求日志融合中间件
+    CORS and Request Logging Middleware
+    """
+
+    def __init__(
+        self,
+        app,
+        allowed_origins: Iterable[str] = (),
+        allow_methods: Iterable[str] = ("GET", "POST", "PUT", "DELETE", "OPTIONS"),
+        allow_headers: Iterable[str] = ("Content-Type", "Authorization"),
+        max_age: int = 600,
+    ):
+        self.app = app
+        self.allowed_origins = frozenset(allowed_origins)
+        self.allow_all_origins = "*" in self.allowed_origins
+        self.allow_methods = tuple(allow_methods)
+
+        allow_headers = sorted(_SAFELISTED_HEADERS | set(allow_headers))
+        self.allow_headers = frozenset(h.lower() for h in allow_headers)
+
+        # 预检响应的固定头在启动时编码为字节，请求时直接拼接
+        self._preflight_headers = [
+            (b"vary", _PREFLIGHT_VARY.encode("latin-1")),
+            (
+                b"access-control-allow-methods",
+                ", ".join(self.allow_methods).encode("latin-1"),
+            ),
+            (b"access-control-max-age", str(max_age).encode("latin-1")),
+            (
+                b"access-control-allow-headers",
+                ", ".join(allow_headers).encode("latin-1"),
+            ),
+            _ALLOW_CREDENTIALS,
+        ]
+
+    def is_allowed_origin(self, origin: str) -> bool:
+        return self.allow_all_origins or origin in self.allowed_origins
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+
+        # 单次遍历取出 CORS 相关请求头
+        origin = request_method = request_headers = None
+        private_network = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value.decode("latin-1")
+            elif name == b"access-control-request-method":
+                request_method = value.decode("latin-1")
+            elif name == b"access-control-request-headers":
+                request_headers = value.decode("latin-1")
+            elif name == b"access-control-request-private-network":
+                private_network = True
+
+        # 预检请求在最外层直接应答，不生成 TraceID、不记录日志、不进入应用
+        if origin is not None and method == "OPTIONS" and request_method is not None:
+            await self._send_preflight(
+                send, origin, request_method, request_headers, private_network
+            )
+            return
+
+        # 生成请求 ID（兼容 request.state.trace_id 读取）
+        trace_id = str(uuid.uuid4())
+        scope.setdefault("state", {})["trace_id"] = trace_id
+
+        path = scope["path"]
+        log_enabled = not should_skip_log(path)
+        start_time = time.perf_counter()
+        status_code = 500
+        if log_enabled:
+            log_request(method, path, trace_id)
+
+        # 简单请求：允许的 Origin 需要回显（携带凭据时不能使用 *）
+        cors_headers = []
+        if origin is not None and self.is_allowed_origin(origin):
+            cors_headers.append(_ALLOW_CREDENTIALS)
+            cors_headers.append(
+                (b"access-control-allow-origin", origin.encode("latin-1"))
+            )
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", ()))
+                _merge_cors_headers(headers, cors_headers)
+                message = {**message, "headers": headers}
+            elif (
+                log_enabled
+                and message["type"] == "http.response.body"
+                and not message.get("more_body", False)
+            ):
+                # 计算耗时（流式响应包含传输时间）
+                duration = (time.perf_counter() - start_time) * 1000
+                log_response(method, path, trace_id, status_code, duration)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as e:
+            if log_enabled:
+                duration = (time.perf_counter() - start_time) * 1000
+                log_error(method, path, trace_id, e, duration)
+            raise
+
+    async def _send_preflight(
+        self,
+        send,
+        origin: str,
+        request_method: str,
+        request_headers: str | None,
+        private_network: bool = False,
+    ):
+        """直接应答预检请求（不进入应用）"""
+        failures = []
+
+        if not self.is_allowed_origin(origin):
+            failures.append("origin")
+
+        if request_method not in self.allow_methods:
+            failures.append("method")
+
+        if request_headers is not None:
+            for header in request_headers.split(","):
+                if header.strip().lower() not in self.allow_headers:
+                    failures.append("headers")
+                    break
+
+        # 不允许私有网络访问
+        if private_network:
+            failures.append("private-network")
+
+        if not failures:
+            # 成功预检：预编码的固定头 + 回显 Origin，204 无响应体（不带 Content-Length）
+            headers = self._preflight_headers + [
+                (b"access-control-allow-origin", origin.encode("latin-1"))
+            ]
+            await send(
+                {"type": "http.response.start", "status": 204, "headers": headers}
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers = list(self._preflight_headers)
+        if "origin" not in failures:
+            headers.append((b"access-control-allow-origin", origin.encode("latin-1")))
+        body = ("Disallowed CORS " + ", ".join(failures)).encode("utf-8")
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        headers.append(_TEXT_CONTENT_TYPE)
+        await send({"type": "http.response.start", "status": 400, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+def _merge_cors_headers(
+    headers: list[tuple[bytes, bytes]], cors_headers: list[tuple[bytes, bytes]]
+):
+    """写入 CORS 响应头，并把 Origin 追加到已有的 Vary 中"""
+    vary = [value for name, value in headers if name.lower() == b"vary"]
+    if vary:
+        headers[:] = [
+            (name, value) for name, value in headers if name.lower() != b"vary"
+        ]
+    vary.append(b"Origin")
+    headers.extend(cors_headers)
+    headers.append((b"vary", b", ".join(vary)))
+
+
+__all__ = ["FusedCorsLoggingMiddleware"]
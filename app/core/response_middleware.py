@@ -1,85 +1,69 @@
 """
-响应中间件
-Response Middleware
+请求日志
+Request Logging
 
-用于记录请求日志、生成 TraceID 和计算请求耗时
+请求/响应/异常日志的记录函数与免记录路径判断，
+由 fused_middleware 中的 CORS + 日志融合中间件调用。
 """
 
-import time
-import uuid
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-
 from app.core.logger import logger
 
+# 不记录日志的页面路径
+_SKIP_LOG_PATHS = frozenset(
+    {
+        "/",
+        "/login",
+        "/imagine",
+        "/voice",
+        "/admin",
+        "/admin/login",
+        "/admin/config",
+        "/admin/cache",
+        "/admin/token",
+    }
+)
 
-class ResponseLoggerMiddleware(BaseHTTPMiddleware):
-    """
-    请求日志/响应追踪中间件
-    Request Logging and Response Tracking Middleware
-    """
-
-    async def dispatch(self, request: Request, call_next):
-        # 生成请求 ID
-        trace_id = str(uuid.uuid4())
-        request.state.trace_id = trace_id
-
-        start_time = time.time()
-        path = request.url.path
 
-        if path.startswith("/static/") or path in (
-            "/",
-            "/login",
-            "/imagine",
-            "/voice",
-            "/admin",
-            "/admin/login",
-            "/admin/config",
-            "/admin/cache",
-            "/admin/token",
-        ):
-            return await call_next(request)
+def should_skip_log(path: str) -> bool:
+    """页面与静态资源请求不记录日志"""
+    return path.startswith("/static/") or path in _SKIP_LOG_PATHS
 
-        # 记录请求信息
-        logger.info(
-            f"Request: {request.method} {request.url.path}",
-            extra={
-                "traceID": trace_id,
-                "method": request.method,
-                "path": request.url.path,
-            },
-        )
 
-        try:
-            response = await call_next(request)
+def log_request(method: str, path: str, trace_id: str):
+    """记录请求信息"""
+    logger.info(
+        f"Request: {method} {path}",
+        extra={
+            "traceID": trace_id,
+            "method": method,
+            "path": path,
+        },
+    )
 
-            # 计算耗时
-            duration = (time.time() - start_time) * 1000
 
-            # 记录响应信息
-            logger.info(
-                f"Response: {request.method} {request.url.path} - {response.status_code} ({duration:.2f}ms)",
-                extra={
-                    "traceID": trace_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "status": response.status_code,
-                    "duration_ms": round(duration, 2),
-                },
-            )
+def log_response(method: str, path: str, trace_id: str, status: int, duration: float):
+    """记录响应信息（duration 单位为毫秒）"""
+    logger.info(
+        f"Response: {method} {path} - {status} ({duration:.2f}ms)",
+        extra={
+            "traceID": trace_id,
+            "method": method,
+            "path": path,
+            "status": status,
+            "duration_ms": round(duration, 2),
+        },
+    )
 
-            return response
 
-        except Exception as e:
-            duration = (time.time() - start_time) * 1000
-            logger.error(
-                f"Response Error: {request.method} {request.url.path} - {str(e)} ({duration:.2f}ms)",
-                extra={
-                    "traceID": trace_id,
-                    "method": request.method,
-                    "path": request.url.path,
-                    "duration_ms": round(duration, 2),
-                    "error": str(e),
-                },
-            )
-            raise e
+def log_error(method: str, path: str, trace_id: str, error: Exception, duration: float):
+    """记录响应异常（duration 单位为毫秒）"""
+    logger.error(
+        f"Response Error: {method} {path} - {str(error)} ({duration:.2f}ms)",
+        extra={
+            "traceID": trace_id,
+            "method": method,
+            "path": path,
+            "duration_ms": round(duration, 2),
+            "error": str(error),
+        },
+    )
@@ -0,0 +1,103 @@
+"""
+静态资源内存缓存
+
+启动时把静态目录下的小文件读入内存，并预先计算 ETag / Content-Type 等响应头，
+请求时直接返回，不再逐次 stat/打开文件。静态资源随版本发布，运行期不变。
+未命中缓存的路径（大文件、目录、不存在的文件）交给 StaticFiles 处理。
+"""
+
+import hashlib
+import mimetypes
+from email.utils import formatdate
+from pathlib import Path
+
+from starlette.staticfiles import StaticFiles
+
+# 超过该大小的文件不缓存，仍由 StaticFiles 流式返回
+MAX_CACHED_FILE_SIZE = 256 * 1024
+
+
+class CachedStatic:
+    """
+    内存缓存静态文件 ASGI 应用
+    In-memory Static Files ASGI App
+    """
+
+    def __init__(self, directory, max_file_size: int = MAX_CACHED_FILE_SIZE):
+        self.directory = Path(directory)
+        self.fallback = StaticFiles(directory=directory)
+        # 相对路径 -> (响应体, ETag, Last-Modified, 响应头)
+        self._cache: dict[str, tuple[bytes, bytes, bytes, list]] = {}
+
+        for file in self.directory.rglob("*"):
+            if not file.is_file():
+                continue
+            stat = file.stat()
+            if stat.st_size > max_file_size:
+                continue
+
+            body = file.read_bytes()
+            etag = f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'.encode()
+            last_modified = formatdate(stat.st_mtime, usegmt=True).encode()
+            content_type = (
+                mimetypes.guess_type(file.name)[0] or "application/octet-stream"
+            )
+            if content_type.startswith("text/"):
+                content_type += "; charset=utf-8"
+
+            headers = [
+                (b"content-type", content_type.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"last-modified", last_modified),
+                (b"etag", etag),
+            ]
+            rel = file.relative_to(self.directory).as_posix()
+            self._cache[rel] = (body, etag, last_modified, headers)
+
+    async def __call__(self, scope, receive, send):
+        method = scope.get("method")
+        if scope["type"] != "http" or method not in ("GET", "HEAD"):
+            return await self.fallback(scope, receive, send)
+
+        # 挂载后 scope["path"] 为完整路径，去掉 root_path 前缀得到相对路径
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+
+        entry = self._cache.get(path.lstrip("/"))
+        if entry is None:
+            return await self.fallback(scope, receive, send)
+
+        body, etag, last_modified, headers = entry
+        if_none_match = if_modified_since = None
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                if_none_match = value
+            elif name == b"if-modified-since":
+                if_modified_since = value
+
+        # 与 StaticFiles 一致：优先比较 If-None-Match，其次 If-Modified-Since
+        if if_none_match is not None:
+            not_modified = etag in [tag.strip() for tag in if_none_match.split(b",")]
+        else:
+            not_modified = if_modified_since == last_modified
+
+        if not_modified:
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [(b"etag", etag), (b"last-modified", last_modified)],
+                }
+            )
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send(
+            {"type": "http.response.body", "body": b"" if method == "HEAD" else body}
+        )
+
+
+__all__ = ["CachedStatic", "MAX_CACHED_FILE_SIZE"]
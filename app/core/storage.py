@@ -630,11 +630,19 @@ class SQLStorage(BaseStorage):
         )
         self.async_session = async_sessionmaker(self.engine, expire_on_commit=False)
         self._initialized = False
+        self._schema_lock = asyncio.Lock()
 
     async def _ensure_schema(self):
-        """确保数据库表存在"""
+        """确保数据库表存在（并发调用时只初始化一次）"""
         if self._initialized:
             return
+        async with self._schema_lock:
+            if self._initialized:
+                return
+            await self._create_schema()
+
+    async def _create_schema(self):
+        """创建数据库表并迁移旧数据"""
         try:
             async with self.engine.begin() as conn:
                 from sqlalchemy import text
@@ -0,0 +1,31 @@
+"""
+gunicorn 模式下使用的 Uvicorn worker
+
+仅在 SERVER_USE_GUNICORN 启用时由 gunicorn 加载（需安装 gunicorn）。
+事件循环、HTTP 解析器与 WebSocket 实现读取 main.py 启动前解析好的环境变量，
+与 uvicorn.run 路径保持一致。
+"""
+
+import os
+
+try:
+    from uvicorn_worker import UvicornWorker as _BaseUvicornWorker
+except ImportError:
+    from uvicorn.workers import UvicornWorker as _BaseUvicornWorker
+
+
+class GrokUvicornWorker(_BaseUvicornWorker):
+    """
+    使用项目协议栈配置的 Uvicorn worker
+    Uvicorn Worker with Project Protocol Settings
+    """
+
+    CONFIG_KWARGS = {
+        **_BaseUvicornWorker.CONFIG_KWARGS,
+        "loop": os.getenv("SERVER_LOOP", "auto"),
+        "http": os.getenv("SERVER_HTTP", "auto"),
+        "ws": os.getenv("SERVER_WS_IMPL", "wsproto"),
+    }
+
+
+__all__ = ["GrokUvicornWorker"]
@@ -48,11 +48,7 @@ class NSFWService:
                 async with ResettableSession(impersonate=browser) as session:
 
                     async def _record_fail(err: UpstreamException, reason: str):
-                        status = None
-                        if err.details and "status" in err.details:
-                            status = err.details["status"]
-                        else:
-                            status = getattr(err, "status_code", None)
+                        status = err.upstream_status
                         if status == 401:
                             await mgr.record_fail(token, status, reason)
                         return status or 0
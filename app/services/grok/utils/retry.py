@@ -42,9 +42,7 @@ async def pick_token(
 
 def extract_status_code(error: Exception) -> Optional[int]:
     if isinstance(error, UpstreamException):
-        if error.details and "status" in error.details:
-            return error.details.get("status")
-        return getattr(error, "status_code", None)
+        return error.upstream_status
     return getattr(error, "status_code", None)
 
 
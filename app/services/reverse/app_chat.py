@@ -7,7 +7,7 @@ from typing import Any, Dict, List, Optional
 from curl_cffi.requests import AsyncSession
 
 from app.core.logger import logger
-from app.core.config import get_config
+from app.core.config import get_config, get_config_many
 from app.core.exceptions import UpstreamException
 from app.services.token.service import TokenService
 from app.services.reverse.utils.headers import build_headers
@@ -41,6 +41,9 @@ class AppChatReverse:
         """Build chat payload for Grok app-chat API."""
 
         attachments = file_attachments or []
+        disable_memory, temporary = get_config_many(
+            "app.disable_memory", "app.temporary"
+        )
 
         payload = {
             "deviceEnvInfo": {
@@ -51,7 +54,7 @@ class AppChatReverse:
                 "viewportWidth": 2056,
                 "viewportHeight": 1083,
             },
-            "disableMemory": get_config("app.disable_memory"),
+            "disableMemory": disable_memory,
             "disableSearch": False,
             "disableSelfHarmShortCircuit": False,
             "disableTextFollowUps": False,
@@ -74,7 +77,7 @@ class AppChatReverse:
             "returnImageBytes": False,
             "returnRawGrokInXaiRequest": False,
             "sendFinalMetadata": True,
-            "temporary": get_config("app.temporary"),
+            "temporary": temporary,
             "toolOverrides": tool_overrides or {},
         }
 
@@ -150,12 +153,14 @@ class AppChatReverse:
             )
 
             # Curl Config
+            chat_timeout, video_timeout, image_timeout, browser = get_config_many(
+                "chat.timeout", "video.timeout", "image.timeout", "proxy.browser"
+            )
             timeout = max(
-                float(get_config("chat.timeout") or 0),
-                float(get_config("video.timeout") or 0),
-                float(get_config("image.timeout") or 0),
+                float(chat_timeout or 0),
+                float(video_timeout or 0),
+                float(image_timeout or 0),
             )
-            browser = get_config("proxy.browser")
 
             async def _do_request(proxy_url, proxies, attempt):
                 response = await session.post(
@@ -191,10 +196,7 @@ class AppChatReverse:
 
             def extract_status(e: Exception) -> Optional[int]:
                 if isinstance(e, UpstreamException):
-                    if e.details and "status" in e.details:
-                        status = e.details["status"]
-                    else:
-                        status = getattr(e, "status_code", None)
+                    status = e.upstream_status
                     if status == 429:
                         return None
                     return status
@@ -217,11 +219,7 @@ class AppChatReverse:
         except Exception as e:
             # Handle upstream exception
             if isinstance(e, UpstreamException):
-                status = None
-                if e.details and "status" in e.details:
-                    status = e.details["status"]
-                else:
-                    status = getattr(e, "status_code", None)
+                status = e.upstream_status
                 if status == 401:
                     try:
                         await TokenService.record_fail(
@@ -273,12 +271,14 @@ class AppChatReverse:
                 model_config_override=model_config_override,
             )
 
+            chat_timeout, video_timeout, image_timeout, browser = get_config_many(
+                "chat.timeout", "video.timeout", "image.timeout", "proxy.browser"
+            )
             timeout = max(
-                float(get_config("chat.timeout") or 0),
-                float(get_config("video.timeout") or 0),
-                float(get_config("image.timeout") or 0),
+                float(chat_timeout or 0),
+                float(video_timeout or 0),
+                float(image_timeout or 0),
             )
-            browser = get_config("proxy.browser")
 
             async def _do_request(proxy_url, proxies, attempt):
                 response = await session.post(
@@ -312,10 +312,7 @@ class AppChatReverse:
 
             def extract_status(e: Exception) -> Optional[int]:
                 if isinstance(e, UpstreamException):
-                    if e.details and "status" in e.details:
-                        status = e.details["status"]
-                    else:
-                        status = getattr(e, "status_code", None)
+                    status = e.upstream_status
                     if status == 429:
                         return None
                     return status
@@ -336,11 +333,7 @@ class AppChatReverse:
 
         except Exception as e:
             if isinstance(e, UpstreamException):
-                status = None
-                if e.details and "status" in e.details:
-                    status = e.details["status"]
-                else:
-                    status = getattr(e, "status_code", None)
+                status = e.upstream_status
                 if status == 401:
                     try:
                         await TokenService.record_fail(
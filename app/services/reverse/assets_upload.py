@@ -88,11 +88,7 @@ class AssetsUploadReverse:
         except Exception as e:
             # Handle upstream exception
             if isinstance(e, UpstreamException):
-                status = None
-                if e.details and "status" in e.details:
-                    status = e.details["status"]
-                else:
-                    status = getattr(e, "status_code", None)
+                status = e.upstream_status
                 if status == 401:
                     try:
                         await TokenService.record_fail(
@@ -93,10 +93,6 @@ class SetBirthReverse:
         except Exception as e:
             # Handle upstream exception
             if isinstance(e, UpstreamException):
-                if e.details and "status" in e.details:
-                    e.details["status"]
-                else:
-                    getattr(e, "status_code", None)
                 raise
 
             # Handle other non-upstream exceptions
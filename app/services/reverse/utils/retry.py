@@ -98,27 +98,8 @@ def extract_retry_after(error: Exception) -> Optional[float]:
     if not isinstance(error, UpstreamException):
         return None
 
-    details = error.details or {}
-
-    # Try to get Retry-After from details
-    retry_after = details.get("retry_after")
-    if retry_after is not None:
-        try:
-            return float(retry_after)
-        except (ValueError, TypeError):
-            pass
-
-    # Try to get Retry-After from headers
-    headers = details.get("headers", {})
-    if isinstance(headers, dict):
-        retry_after = headers.get("Retry-After") or headers.get("retry-after")
-        if retry_after is not None:
-            try:
-                return float(retry_after)
-            except (ValueError, TypeError):
-                pass
-
-    return None
+    # Parsed from details["retry_after"] or the Retry-After header at construction
+    return error.retry_after
 
 
 async def retry_on_status(
@@ -152,10 +133,8 @@ async def retry_on_status(
 
         def extract_status(e: Exception) -> Optional[int]:
             if isinstance(e, UpstreamException):
-                # Try to get status code from details, fallback to status_code attribute
-                if e.details and "status" in e.details:
-                    return e.details["status"]
-                return getattr(e, "status_code", None)
+                # details["status"] if present, else status_code (resolved at construction)
+                return e.upstream_status
             return None
 
     while ctx.attempt <= ctx.max_retry:
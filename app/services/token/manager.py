@@ -585,11 +585,7 @@ class TokenManager:
 
         except Exception as e:
             if isinstance(e, UpstreamException):
-                status = None
-                if e.details and "status" in e.details:
-                    status = e.details["status"]
-                else:
-                    status = getattr(e, "status_code", None)
+                status = e.upstream_status
                 if status == 401:
                     await self.record_fail(token_str, status, "rate_limits_auth_failed")
             logger.warning(
@@ -57,6 +57,7 @@ class TokenPool:
         self._tokens: Dict[str, TokenInfo] = {}
         self._quota_buckets: Dict[int, _TokenBucket] = {}
         self._non_empty_quotas: Set[int] = set()
+        self._max_quota: int = 0
 
     def _bucket_for_quota(self, quota: int) -> _TokenBucket:
         bucket = self._quota_buckets.get(quota)
@@ -71,6 +72,8 @@ class TokenPool:
         bucket = self._bucket_for_quota(token.quota)
         bucket.add(token.token)
         self._non_empty_quotas.add(token.quota)
+        if token.quota > self._max_quota:
+            self._max_quota = token.quota
 
     def _index_remove(self, token_str: str, quota: int, status: TokenStatus):
         if status != TokenStatus.ACTIVE or quota <= 0:
@@ -81,6 +84,9 @@ class TokenPool:
         bucket.remove(token_str)
         if len(bucket) == 0:
             self._non_empty_quotas.discard(quota)
+            # 仅在桶清空时回退最大额度指针
+            if quota == self._max_quota:
+                self._max_quota = max(self._non_empty_quotas, default=0)
 
     def update_index(self, token: TokenInfo, old_quota: int, old_status: TokenStatus):
         """增量更新索引"""
@@ -116,22 +122,37 @@ class TokenPool:
         if not self._non_empty_quotas:
             return None
 
+        # 快速路径: 直接命中最高额度桶
+        token = self._pick_from_bucket(self._max_quota, exclude)
+        if token:
+            return token
+
+        # 回退: 按额度从高到低遍历其余桶
         quotas = sorted(self._non_empty_quotas, reverse=True)
         for quota in quotas:
-            bucket = self._quota_buckets.get(quota)
-            if not bucket:
-                continue
-            token_str = bucket.pick(exclude)
-            if not token_str:
-                continue
-            token = self._tokens.get(token_str)
-            if not token:
+            if quota == self._max_quota:
                 continue
-            if token.status != TokenStatus.ACTIVE or token.quota <= 0:
-                continue
-            return token
+            token = self._pick_from_bucket(quota, exclude)
+            if token:
+                return token
         return None
 
+    def _pick_from_bucket(
+        self, quota: int, exclude: Optional[Set[str]] = None
+    ) -> Optional[TokenInfo]:
+        bucket = self._quota_buckets.get(quota)
+        if not bucket:
+            return None
+        token_str = bucket.pick(exclude)
+        if not token_str:
+            return None
+        token = self._tokens.get(token_str)
+        if not token:
+            return None
+        if token.status != TokenStatus.ACTIVE or token.quota <= 0:
+            return None
+        return token
+
     def count(self) -> int:
         """Token 数量"""
         return len(self._tokens)
@@ -165,6 +186,7 @@ class TokenPool:
         """重建索引（预留接口，用于加载时调用）"""
         self._quota_buckets = {}
         self._non_empty_quotas = set()
+        self._max_quota = 0
         for token in self._tokens.values():
             self._index_add(token)
 
@@ -48,6 +48,7 @@ from app.utils.circuit_breaker import (
 from app.utils.websocket_pool import (
     ConnectionState,
     PooledConnection,
+    PoolTimeoutError,
     WebSocketPool,
     get_websocket_pool,
 )
@@ -95,6 +96,7 @@ __all__ = [
     # WebSocket pool
     "ConnectionState",
     "PooledConnection",
+    "PoolTimeoutError",
     "WebSocketPool",
     "get_websocket_pool",
     # Distributed cache
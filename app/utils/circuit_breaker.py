@@ -13,9 +13,12 @@
 - OPEN -> HALF_OPEN：冷却时间后
 - HALF_OPEN -> CLOSED：成功率达标
 - HALF_OPEN -> OPEN：失败继续
+
+日志使用 loguru 的延迟格式化（位置参数），级别被过滤时不会构建消息字符串。
 """
 
 import asyncio
+import threading
 import time
 from enum import Enum
 from typing import Callable, Optional, TypeVar, ParamSpec
@@ -36,7 +39,7 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # 半开状态，尝试恢复
 
 
-@dataclass
+@dataclass(slots=True)
 class CircuitBreakerConfig:
     """熔断器配置"""
 
@@ -56,7 +59,7 @@ class CircuitBreakerConfig:
     half_open_max_calls: int = 3
 
 
-@dataclass
+@dataclass(slots=True)
 class CircuitBreakerStats:
     """熔断器统计信息"""
 
@@ -87,6 +90,13 @@ class CircuitBreakerOpenError(AppException):
 class CircuitBreaker:
     """熔断器"""
 
+    __slots__ = (
+        "name",
+        "config",
+        "stats",
+        "_probes_started",
+    )
+
     def __init__(
         self,
         name: str,
@@ -102,8 +112,8 @@ class CircuitBreaker:
         self.name = name
         self.config = config or CircuitBreakerConfig()
         self.stats = CircuitBreakerStats()
-        self._lock = asyncio.Lock()
-        self._half_open_calls = 0
+        # 半开状态下已放行的探测请求数
+        self._probes_started = 0
 
     async def call(
         self,
@@ -126,134 +136,152 @@ class CircuitBreaker:
             CircuitBreakerOpenError: 熔断器打开时
             其他异常: 函数执行失败时
         """
-        async with self._lock:
-            self.stats.total_calls += 1
-
-            # 检查熔断器状态
-            if self.stats.state == CircuitState.OPEN:
+        stats = self.stats
+        stats.total_calls += 1
+
+        # CLOSED 为常态，直接放行。
+        # 状态检查与探测计数中没有 await，在单线程事件循环中天然原子，无需加锁。
+        if stats.state is not CircuitState.CLOSED:
+            if stats.state == CircuitState.OPEN:
+                now = time.monotonic()
                 # 检查是否可以进入半开状态
-                if self._should_attempt_reset():
-                    self._transition_to_half_open()
+                if self._should_attempt_reset(now):
+                    self._transition_to_half_open(now)
                 else:
-                    self.stats.total_rejected += 1
+                    stats.total_rejected += 1
                     logger.warning(
-                        f"Circuit breaker '{self.name}' is OPEN, rejecting call"
+                        "Circuit breaker '{}' is OPEN, rejecting call", self.name
                     )
                     raise CircuitBreakerOpenError()
-
-            elif self.stats.state == CircuitState.HALF_OPEN:
-                # 半开状态下限制请求数
-                if self._half_open_calls >= self.config.half_open_max_calls:
-                    self.stats.total_rejected += 1
+            elif stats.state == CircuitState.HALF_OPEN:
+                # 半开状态下限制探测请求数
+                if self._probes_started >= self.config.half_open_max_calls:
+                    stats.total_rejected += 1
                     logger.warning(
-                        f"Circuit breaker '{self.name}' is HALF_OPEN, "
-                        f"max calls reached, rejecting call"
+                        "Circuit breaker '{}' is HALF_OPEN, "
+                        "max calls reached, rejecting call",
+                        self.name,
                     )
                     raise CircuitBreakerOpenError()
-                self._half_open_calls += 1
+                self._probes_started += 1
 
         # 执行函数调用
         try:
-            # 添加超时控制
-            result = await asyncio.wait_for(
-                func(*args, **kwargs),
-                timeout=self.config.timeout,
-            )
+            # 添加超时控制（asyncio.timeout 不额外创建 Task）
+            async with asyncio.timeout(self.config.timeout):
+                result = await func(*args, **kwargs)
 
             # 记录成功
-            await self._on_success()
+            self._on_success()
             return result
 
-        except asyncio.TimeoutError:
+        except TimeoutError:
             # 超时视为失败
-            await self._on_failure()
+            self._on_failure()
             self.stats.total_timeouts += 1
             logger.warning(
-                f"Circuit breaker '{self.name}' call timeout after {self.config.timeout}s"
+                "Circuit breaker '{}' call timeout after {}s",
+                self.name,
+                self.config.timeout,
             )
             raise
 
         except Exception:
             # 记录失败
-            await self._on_failure()
+            self._on_failure()
             raise
 
-    async def _on_success(self):
-        """处理成功调用"""
-        async with self._lock:
-            self.stats.total_successes += 1
+    def _on_success(self):
+        """
+        处理成功调用
 
-            if self.stats.state == CircuitState.HALF_OPEN:
-                self.stats.success_count += 1
-                logger.debug(
-                    f"Circuit breaker '{self.name}' HALF_OPEN success "
-                    f"({self.stats.success_count}/{self.config.success_threshold})"
-                )
+        同步执行（中间无 await），在单线程事件循环中天然原子，无需加锁。
+        """
+        stats = self.stats
+        stats.total_successes += 1
+
+        if stats.state == CircuitState.HALF_OPEN:
+            stats.success_count += 1
+            logger.debug(
+                "Circuit breaker '{}' HALF_OPEN success ({}/{})",
+                self.name,
+                stats.success_count,
+                self.config.success_threshold,
+            )
 
-                # 达到成功阈值，关闭熔断器
-                if self.stats.success_count >= self.config.success_threshold:
-                    self._transition_to_closed()
+            # 达到成功阈值，关闭熔断器
+            if stats.success_count >= self.config.success_threshold:
+                self._transition_to_closed()
 
-            elif self.stats.state == CircuitState.CLOSED:
-                # 重置失败计数
-                self.stats.failure_count = 0
+        elif stats.state == CircuitState.CLOSED:
+            # 重置失败计数
+            stats.failure_count = 0
 
-    async def _on_failure(self):
-        """处理失败调用"""
-        async with self._lock:
-            self.stats.total_failures += 1
-            self.stats.failure_count += 1
-            self.stats.last_failure_time = time.monotonic()
+    def _on_failure(self):
+        """
+        处理失败调用
+
+        同步执行（中间无 await），在单线程事件循环中天然原子，无需加锁。
+        """
+        stats = self.stats
+        stats.total_failures += 1
+        stats.failure_count += 1
+        now = time.monotonic()
+        stats.last_failure_time = now
+
+        if stats.state == CircuitState.HALF_OPEN:
+            # 半开状态下失败，立即打开熔断器
+            logger.warning(
+                "Circuit breaker '{}' HALF_OPEN failed, transitioning to OPEN",
+                self.name,
+            )
+            self._transition_to_open(now)
 
-            if self.stats.state == CircuitState.HALF_OPEN:
-                # 半开状态下失败，立即打开熔断器
+        elif stats.state == CircuitState.CLOSED:
+            # 检查是否达到失败阈值
+            if stats.failure_count >= self.config.failure_threshold:
                 logger.warning(
-                    f"Circuit breaker '{self.name}' HALF_OPEN failed, "
-                    f"transitioning to OPEN"
+                    "Circuit breaker '{}' failure threshold reached ({}/{}), "
+                    "transitioning to OPEN",
+                    self.name,
+                    stats.failure_count,
+                    self.config.failure_threshold,
                 )
-                self._transition_to_open()
+                self._transition_to_open(now)
 
-            elif self.stats.state == CircuitState.CLOSED:
-                # 检查是否达到失败阈值
-                if self.stats.failure_count >= self.config.failure_threshold:
-                    logger.warning(
-                        f"Circuit breaker '{self.name}' failure threshold reached "
-                        f"({self.stats.failure_count}/{self.config.failure_threshold}), "
-                        f"transitioning to OPEN"
-                    )
-                    self._transition_to_open()
-
-    def _should_attempt_reset(self) -> bool:
+    def _should_attempt_reset(self, now: Optional[float] = None) -> bool:
         """检查是否应该尝试重置（OPEN -> HALF_OPEN）"""
-        elapsed = time.monotonic() - self.stats.last_state_change_time
+        if now is None:
+            now = time.monotonic()
+        elapsed = now - self.stats.last_state_change_time
         return elapsed >= self.config.cooldown_seconds
 
-    def _transition_to_closed(self):
+    def _transition_to_closed(self, now: Optional[float] = None):
         """转换到关闭状态"""
-        logger.info(f"Circuit breaker '{self.name}' transitioning to CLOSED")
+        logger.info("Circuit breaker '{}' transitioning to CLOSED", self.name)
         self.stats.state = CircuitState.CLOSED
         self.stats.failure_count = 0
         self.stats.success_count = 0
-        self.stats.last_state_change_time = time.monotonic()
-        self._half_open_calls = 0
+        self.stats.last_state_change_time = time.monotonic() if now is None else now
+        self._probes_started = 0
 
-    def _transition_to_open(self):
+    def _transition_to_open(self, now: Optional[float] = None):
         """转换到打开状态"""
-        logger.warning(f"Circuit breaker '{self.name}' transitioning to OPEN")
+        logger.warning("Circuit breaker '{}' transitioning to OPEN", self.name)
         self.stats.state = CircuitState.OPEN
         self.stats.failure_count = 0
         self.stats.success_count = 0
-        self.stats.last_state_change_time = time.monotonic()
-        self._half_open_calls = 0
+        self.stats.last_state_change_time = time.monotonic() if now is None else now
+        self._probes_started = 0
 
-    def _transition_to_half_open(self):
+    def _transition_to_half_open(self, now: Optional[float] = None):
         """转换到半开状态"""
-        logger.info(f"Circuit breaker '{self.name}' transitioning to HALF_OPEN")
+        logger.info("Circuit breaker '{}' transitioning to HALF_OPEN", self.name)
         self.stats.state = CircuitState.HALF_OPEN
         self.stats.failure_count = 0
         self.stats.success_count = 0
-        self.stats.last_state_change_time = time.monotonic()
-        self._half_open_calls = 0
+        self.stats.last_state_change_time = time.monotonic() if now is None else now
+        self._probes_started = 0
 
     def get_stats(self) -> dict:
         """
@@ -274,6 +302,7 @@ class CircuitBreaker:
             "total_rejected": self.stats.total_rejected,
             "last_failure_time": self.stats.last_failure_time,
             "last_state_change_time": self.stats.last_state_change_time,
+            "probes_started": self._probes_started,
             "config": {
                 "failure_threshold": self.config.failure_threshold,
                 "success_threshold": self.config.success_threshold,
@@ -285,13 +314,14 @@ class CircuitBreaker:
 
     async def reset(self):
         """手动重置熔断器到关闭状态"""
-        async with self._lock:
-            logger.info(f"Circuit breaker '{self.name}' manually reset to CLOSED")
-            self._transition_to_closed()
+        logger.info("Circuit breaker '{}' manually reset to CLOSED", self.name)
+        self._transition_to_closed()
 
 
 # 全局熔断器注册表
 _circuit_breakers: dict[str, CircuitBreaker] = {}
+# 仅保护创建过程（可能在导入/装饰阶段从同步上下文调用）
+_circuit_breakers_lock = threading.Lock()
 
 
 def get_circuit_breaker(
@@ -308,9 +338,17 @@ def get_circuit_breaker(
     Returns:
         CircuitBreaker 实例
     """
-    if name not in _circuit_breakers:
-        _circuit_breakers[name] = CircuitBreaker(name, config)
-    return _circuit_breakers[name]
+    try:
+        return _circuit_breakers[name]
+    except KeyError:
+        pass
+
+    with _circuit_breakers_lock:
+        breaker = _circuit_breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(name, config)
+            _circuit_breakers[name] = breaker
+        return breaker
 
 
 def with_circuit_breaker(
@@ -335,6 +373,7 @@ def with_circuit_breaker(
     """
 
     def decorator(func: Callable[P, T]) -> Callable[P, T]:
+        # 装饰时解析一次，调用时不再查注册表
         breaker = get_circuit_breaker(name, config)
 
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
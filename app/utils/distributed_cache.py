@@ -11,16 +11,36 @@
 """
 
 import asyncio
+import fnmatch
+import inspect
+import random
+import re
+import sys
+import threading
 import time
-import json
+from collections import OrderedDict
 from typing import Any, Optional, Callable, TypeVar
 from functools import wraps
 
+import orjson
+
 from app.core.logger import logger
 from app.core.config import get_config
 
 T = TypeVar("T")
 
+# get_or_set 生成方被取消时写入 in-flight future 的标记，等待方据此重试
+_PRODUCER_CANCELLED = object()
+
+
+def _compile_pattern(pattern: str) -> Callable[[str], bool]:
+    """将通配符模式编译为匹配函数（"prefix*" 形式直接使用 startswith）"""
+    head = pattern[:-1]
+    if pattern.endswith("*") and not any(c in head for c in "*?["):
+        return lambda key: key.startswith(head)
+    regex = re.compile(fnmatch.translate(pattern))
+    return lambda key: regex.match(key) is not None
+
 
 class DistributedCache:
     """分布式缓存管理器（使用 JSON 序列化）"""
@@ -32,6 +52,7 @@ class DistributedCache:
         key_prefix: str = "grok2api:",
         enable_local_cache: bool = True,
         local_cache_size: int = 1000,
+        jitter_fraction: float = 0.1,
     ):
         """
         初始化分布式缓存
@@ -42,44 +63,58 @@ class DistributedCache:
             key_prefix: 键前缀
             enable_local_cache: 是否启用本地缓存（L1）
             local_cache_size: 本地缓存大小
+            jitter_fraction: TTL 随机抖动比例（避免批量写入的键同时过期）
         """
         self.redis = redis_client
         self.default_ttl = default_ttl
-        self.key_prefix = key_prefix
+        self.key_prefix = sys.intern(key_prefix)
         self.enable_local_cache = enable_local_cache
+        self.jitter_fraction = max(0.0, jitter_fraction)
 
-        # L1 本地缓存（进程内）
-        self._local_cache: dict[str, tuple[Any, float]] = {}
+        # L1 本地缓存（进程内，OrderedDict 维护 LRU 顺序，尾部为最近访问）
+        # 以原始键索引，仅在访问 Redis 时拼接前缀
+        self._local_cache: OrderedDict[str, tuple[Any, float]] = OrderedDict()
         self._local_cache_size = local_cache_size
-        self._local_access_order: list[str] = []
-
-        # 统计信息
-        self._stats = {
-            "l1_hits": 0,
-            "l1_misses": 0,
-            "l2_hits": 0,
-            "l2_misses": 0,
-            "sets": 0,
-            "deletes": 0,
-        }
+        # 本地缓存临界区全为同步代码，使用线程锁（比 asyncio.Lock 更轻，且可跨线程）
+        self._local_lock = threading.Lock()
 
-    def _make_key(self, key: str) -> str:
-        """生成完整的缓存键"""
-        return f"{self.key_prefix}{key}"
+        # 正在生成中的键（single-flight）
+        self._inflight: dict[str, asyncio.Future] = {}
 
-    def _serialize(self, value: Any) -> str:
-        """序列化值为 JSON 字符串"""
+        # 统计信息（普通属性计数，避免热路径上的字典查找）
+        self._l1_hits = 0
+        self._l1_misses = 0
+        self._l2_hits = 0
+        self._l2_misses = 0
+        self._sets = 0
+        self._deletes = 0
+
+    def _make_key(self, key: str) -> str:
+        """生成完整的缓存键（Redis）"""
+        return self.key_prefix + key
+
+    def _jitter_ttl(self, ttl: int) -> int:
+        """为 TTL 加入随机抖动（不小于 1 秒）"""
+        if ttl <= 0 or self.jitter_fraction <= 0:
+            return ttl
+        spread = int(ttl * self.jitter_fraction)
+        if spread <= 0:
+            return ttl
+        return max(1, ttl + random.randint(-spread, spread))
+
+    def _serialize(self, value: Any) -> bytes:
+        """序列化值为 JSON 字节串"""
         try:
-            return json.dumps(value, ensure_ascii=False)
-        except (TypeError, ValueError) as e:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError as e:
             logger.warning(f"Failed to serialize value: {e}")
             raise
 
-    def _deserialize(self, data: str) -> Any:
-        """反序列化 JSON 字符串为值"""
+    def _deserialize(self, data: bytes | str) -> Any:
+        """反序列化 JSON 字节串为值"""
         try:
-            return json.loads(data)
-        except (TypeError, ValueError) as e:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError as e:
             logger.warning(f"Failed to deserialize data: {e}")
             raise
 
@@ -88,55 +123,48 @@ class DistributedCache:
         if not self.enable_local_cache:
             return False, None
 
-        full_key = self._make_key(key)
-        if full_key not in self._local_cache:
-            self._stats["l1_misses"] += 1
-            return False, None
+        with self._local_lock:
+            entry = self._local_cache.get(key)
+            if entry is None:
+                self._l1_misses += 1
+                return False, None
 
-        value, expire_at = self._local_cache[full_key]
+            value, expire_at = entry
 
-        # 检查是否过期
-        if expire_at > 0 and time.time() > expire_at:
-            del self._local_cache[full_key]
-            if full_key in self._local_access_order:
-                self._local_access_order.remove(full_key)
-            self._stats["l1_misses"] += 1
-            return False, None
+            # 检查是否过期
+            if expire_at > 0 and time.time() > expire_at:
+                del self._local_cache[key]
+                self._l1_misses += 1
+                return False, None
 
-        # 更新访问顺序
-        if full_key in self._local_access_order:
-            self._local_access_order.remove(full_key)
-        self._local_access_order.append(full_key)
+            # 更新访问顺序
+            self._local_cache.move_to_end(key)
 
-        self._stats["l1_hits"] += 1
-        return True, value
+            self._l1_hits += 1
+            return True, value
 
     def _set_to_local(self, key: str, value: Any, ttl: int):
         """设置到本地缓存"""
         if not self.enable_local_cache:
             return
 
-        full_key = self._make_key(key)
-
-        # LRU 淘汰
-        if len(self._local_cache) >= self._local_cache_size:
-            if self._local_access_order:
-                lru_key = self._local_access_order.pop(0)
-                self._local_cache.pop(lru_key, None)
-
         expire_at = time.time() + ttl if ttl > 0 else 0
-        self._local_cache[full_key] = (value, expire_at)
-        self._local_access_order.append(full_key)
+        with self._local_lock:
+            # LRU 淘汰（覆盖已有键时无需淘汰）
+            if key in self._local_cache:
+                self._local_cache.move_to_end(key)
+            elif len(self._local_cache) >= self._local_cache_size and self._local_cache:
+                self._local_cache.popitem(last=False)
+
+            self._local_cache[key] = (value, expire_at)
 
     def _delete_from_local(self, key: str):
         """从本地缓存删除"""
         if not self.enable_local_cache:
             return
 
-        full_key = self._make_key(key)
-        self._local_cache.pop(full_key, None)
-        if full_key in self._local_access_order:
-            self._local_access_order.remove(full_key)
+        with self._local_lock:
+            self._local_cache.pop(key, None)
 
     async def get(self, key: str) -> Optional[Any]:
         """
@@ -155,25 +183,26 @@ class DistributedCache:
 
         # L2: Redis 缓存
         if self.redis is None:
-            self._stats["l2_misses"] += 1
+            self._l2_misses += 1
             return None
 
         try:
             full_key = self._make_key(key)
-            data = await self.redis.get(full_key)
+            # GET + TTL 合并为一次往返
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.get(full_key)
+            pipe.ttl(full_key)
+            data, ttl = await pipe.execute()
 
             if data is None:
-                self._stats["l2_misses"] += 1
+                self._l2_misses += 1
                 return None
 
             # 反序列化
-            if isinstance(data, bytes):
-                data = data.decode("utf-8")
             value = self._deserialize(data)
-            self._stats["l2_hits"] += 1
+            self._l2_hits += 1
 
             # 回填到本地缓存
-            ttl = await self.redis.ttl(full_key)
             if ttl > 0:
                 self._set_to_local(key, value, ttl)
 
@@ -181,7 +210,7 @@ class DistributedCache:
 
         except Exception as e:
             logger.warning(f"Failed to get from Redis cache: {e}")
-            self._stats["l2_misses"] += 1
+            self._l2_misses += 1
             return None
 
     async def set(self, key: str, value: Any, ttl: Optional[int] = None):
@@ -195,8 +224,9 @@ class DistributedCache:
         """
         if ttl is None:
             ttl = self.default_ttl
+        ttl = self._jitter_ttl(ttl)
 
-        self._stats["sets"] += 1
+        self._sets += 1
 
         # 设置到本地缓存
         self._set_to_local(key, value, ttl)
@@ -217,6 +247,112 @@ class DistributedCache:
         except Exception as e:
             logger.warning(f"Failed to set to Redis cache: {e}")
 
+    async def mget(self, keys: list[str]) -> list[Optional[Any]]:
+        """
+        批量获取缓存值（L2 未命中部分合并为一次 Redis 往返）
+
+        Args:
+            keys: 缓存键列表
+
+        Returns:
+            与 keys 一一对应的缓存值列表，不存在的项为 None
+        """
+        results: list[Optional[Any]] = [None] * len(keys)
+
+        # L1: 本地缓存
+        misses: list[int] = []
+        for i, key in enumerate(keys):
+            hit, value = self._get_from_local(key)
+            if hit:
+                results[i] = value
+            else:
+                misses.append(i)
+
+        if not misses:
+            return results
+
+        # L2: Redis 缓存
+        if self.redis is None:
+            self._l2_misses += len(misses)
+            return results
+
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for i in misses:
+                full_key = self._make_key(keys[i])
+                pipe.get(full_key)
+                pipe.ttl(full_key)
+            replies = await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to mget from Redis cache: {e}")
+            self._l2_misses += len(misses)
+            return results
+
+        for n, i in enumerate(misses):
+            data, ttl = replies[2 * n], replies[2 * n + 1]
+            if data is None:
+                self._l2_misses += 1
+                continue
+            try:
+                value = self._deserialize(data)
+            except Exception:
+                self._l2_misses += 1
+                continue
+
+            self._l2_hits += 1
+            results[i] = value
+
+            # 回填到本地缓存
+            if ttl > 0:
+                self._set_to_local(keys[i], value, ttl)
+
+        return results
+
+    async def mset(self, items: dict[str, Any], ttl: Optional[int] = None):
+        """
+        批量设置缓存值（Redis 写入合并为一次往返）
+
+        Args:
+            items: 键值映射（值必须可 JSON 序列化）
+            ttl: TTL（秒），None 使用默认值
+        """
+        if not items:
+            return
+        if ttl is None:
+            ttl = self.default_ttl
+
+        self._sets += len(items)
+
+        pipe = (
+            self.redis.pipeline(transaction=False) if self.redis is not None else None
+        )
+        for key, value in items.items():
+            # 每个键单独抖动，避免同批写入同时过期
+            key_ttl = self._jitter_ttl(ttl)
+            self._set_to_local(key, value, key_ttl)
+
+            if pipe is None:
+                continue
+            try:
+                data = self._serialize(value)
+            except Exception as e:
+                # 与 set 一致：跳过无法序列化的值（仅保留在本地缓存）并记录
+                logger.warning(f"Failed to mset key {key} to Redis cache: {e}")
+                continue
+            full_key = self._make_key(key)
+            if key_ttl > 0:
+                pipe.setex(full_key, key_ttl, data)
+            else:
+                pipe.set(full_key, data)
+
+        if pipe is None:
+            return
+
+        try:
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Failed to mset to Redis cache: {e}")
+
     async def delete(self, key: str):
         """
         删除缓存值
@@ -224,7 +360,7 @@ class DistributedCache:
         Args:
             key: 缓存键
         """
-        self._stats["deletes"] += 1
+        self._deletes += 1
 
         # 从本地缓存删除
         self._delete_from_local(key)
@@ -273,21 +409,15 @@ class DistributedCache:
             pattern: 键模式（支持通配符），None 表示清空所有
         """
         # 清空本地缓存
-        if pattern is None:
-            self._local_cache.clear()
-            self._local_access_order.clear()
-        else:
-            # 模式匹配删除
-            import fnmatch
-
-            full_pattern = self._make_key(pattern)
-            keys_to_delete = [
-                k for k in self._local_cache.keys() if fnmatch.fnmatch(k, full_pattern)
-            ]
-            for k in keys_to_delete:
-                self._local_cache.pop(k, None)
-                if k in self._local_access_order:
-                    self._local_access_order.remove(k)
+        with self._local_lock:
+            if pattern is None:
+                self._local_cache.clear()
+            else:
+                # 模式匹配删除
+                match = _compile_pattern(pattern)
+                keys_to_delete = [k for k in self._local_cache.keys() if match(k)]
+                for k in keys_to_delete:
+                    self._local_cache.pop(k, None)
 
         # 清空 Redis
         if self.redis is None:
@@ -304,10 +434,11 @@ class DistributedCache:
                 cursor, keys = await self.redis.scan(
                     cursor=cursor,
                     match=full_pattern,
-                    count=100,
+                    count=1000,
                 )
-                if keys:
-                    await self.redis.delete(*keys)
+                # UNLINK 在 Redis 后台线程释放内存，分批避免命令过大
+                for i in range(0, len(keys), 500):
+                    await self.redis.unlink(*keys[i : i + 500])
                 if cursor == 0:
                     break
 
@@ -323,6 +454,8 @@ class DistributedCache:
         """
         获取缓存值，如果不存在则调用工厂函数生成并缓存
 
+        同一键的并发未命中只会执行一次工厂函数，其余调用等待其结果（single-flight）。
+
         Args:
             key: 缓存键
             factory: 工厂函数（同步或异步）
@@ -336,15 +469,42 @@ class DistributedCache:
         if value is not None:
             return value
 
-        # 调用工厂函数
-        if asyncio.iscoroutinefunction(factory):
-            value = await factory()
-        else:
+        # 已有相同键正在生成，等待其结果（shield 防止等待方取消影响生成方）
+        inflight = self._inflight.get(key)
+        while inflight is not None:
+            value = await asyncio.shield(inflight)
+            if value is not _PRODUCER_CANCELLED:
+                return value
+            # 生成方被取消：重新检查缓存，仍未命中则由首个醒来的等待方接手生成
+            value = await self.get(key)
+            if value is not None:
+                return value
+            inflight = self._inflight.get(key)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # 调用工厂函数（同步函数返回可等待对象时同样等待其结果）
             value = factory()
+            if inspect.isawaitable(value):
+                value = await value
 
-        # 缓存结果
-        await self.set(key, value, ttl)
-        return value
+            # 缓存结果
+            await self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except asyncio.CancelledError:
+            # 只有生成方被取消，不把取消传播给等待方
+            future.set_result(_PRODUCER_CANCELLED)
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 标记异常已读取，避免无等待方时告警
+            future.exception()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
 
     def get_stats(self) -> dict:
         """
@@ -353,39 +513,43 @@ class DistributedCache:
         Returns:
             统计信息字典
         """
-        l1_total = self._stats["l1_hits"] + self._stats["l1_misses"]
-        l1_hit_rate = (self._stats["l1_hits"] / l1_total * 100) if l1_total > 0 else 0.0
+        l1_total = self._l1_hits + self._l1_misses
+        l1_hit_rate = (self._l1_hits / l1_total * 100) if l1_total > 0 else 0.0
 
-        l2_total = self._stats["l2_hits"] + self._stats["l2_misses"]
-        l2_hit_rate = (self._stats["l2_hits"] / l2_total * 100) if l2_total > 0 else 0.0
+        l2_total = self._l2_hits + self._l2_misses
+        l2_hit_rate = (self._l2_hits / l2_total * 100) if l2_total > 0 else 0.0
 
         return {
             "l1_size": len(self._local_cache),
             "l1_max_size": self._local_cache_size,
-            "l1_hits": self._stats["l1_hits"],
-            "l1_misses": self._stats["l1_misses"],
+            "l1_hits": self._l1_hits,
+            "l1_misses": self._l1_misses,
             "l1_hit_rate": f"{l1_hit_rate:.2f}%",
-            "l2_hits": self._stats["l2_hits"],
-            "l2_misses": self._stats["l2_misses"],
+            "l2_hits": self._l2_hits,
+            "l2_misses": self._l2_misses,
             "l2_hit_rate": f"{l2_hit_rate:.2f}%",
-            "sets": self._stats["sets"],
-            "deletes": self._stats["deletes"],
+            "sets": self._sets,
+            "deletes": self._deletes,
         }
 
     def log_stats(self):
         """记录缓存统计信息到日志"""
         stats = self.get_stats()
         logger.info(
-            f"Distributed cache stats: "
-            f"L1={stats['l1_size']}/{stats['l1_max_size']} "
-            f"(hit_rate={stats['l1_hit_rate']}), "
-            f"L2_hit_rate={stats['l2_hit_rate']}, "
-            f"sets={stats['sets']}, deletes={stats['deletes']}"
+            "Distributed cache stats: L1={}/{} (hit_rate={}), "
+            "L2_hit_rate={}, sets={}, deletes={}",
+            stats["l1_size"],
+            stats["l1_max_size"],
+            stats["l1_hit_rate"],
+            stats["l2_hit_rate"],
+            stats["sets"],
+            stats["deletes"],
         )
 
 
 # 全局缓存实例
 _distributed_cache: Optional[DistributedCache] = None
+_distributed_cache_lock = asyncio.Lock()
 
 
 async def get_distributed_cache() -> DistributedCache:
@@ -397,7 +561,16 @@ async def get_distributed_cache() -> DistributedCache:
     """
     global _distributed_cache
 
-    if _distributed_cache is None:
+    # 快速路径：已初始化
+    cache = _distributed_cache
+    if cache is not None:
+        return cache
+
+    # 首次初始化加锁，防止并发创建多个 Redis 连接
+    async with _distributed_cache_lock:
+        if _distributed_cache is not None:
+            return _distributed_cache
+
         # 尝试连接 Redis
         redis_client = None
         storage_type = get_config("server.storage_type", "local")
@@ -445,34 +618,36 @@ def cached(
         ...     pass
     """
 
+    # 键前缀在装饰时拼接一次
+    prefix = f"{key_prefix}:"
+
     def decorator(func: Callable) -> Callable:
+        is_coroutine = asyncio.iscoroutinefunction(func)
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             cache = await get_distributed_cache()
 
             # 构建缓存键
             if key_builder:
-                cache_key = f"{key_prefix}:{key_builder(*args, **kwargs)}"
+                cache_key = prefix + str(key_builder(*args, **kwargs))
+            elif not kwargs:
+                # 仅位置参数：无需排序
+                cache_key = prefix + ":".join(map(str, args))
             else:
-                # 默认使用参数构建键
+                # 默认使用参数构建键（单个关键字参数无需排序）
+                items = kwargs.items() if len(kwargs) == 1 else sorted(kwargs.items())
                 key_parts = [str(arg) for arg in args]
-                key_parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
-                cache_key = f"{key_prefix}:{':'.join(key_parts)}"
-
-            # 尝试从缓存获取
-            value = await cache.get(cache_key)
-            if value is not None:
-                return value
+                key_parts.extend(f"{k}={v}" for k, v in items)
+                cache_key = prefix + ":".join(key_parts)
 
-            # 调用原函数
-            if asyncio.iscoroutinefunction(func):
-                value = await func(*args, **kwargs)
-            else:
-                value = func(*args, **kwargs)
+            async def factory():
+                if is_coroutine:
+                    return await func(*args, **kwargs)
+                return func(*args, **kwargs)
 
-            # 缓存结果
-            await cache.set(cache_key, value, ttl)
-            return value
+            # 获取或生成（并发未命中合并为一次调用）
+            return await cache.get_or_set(cache_key, factory, ttl)
 
         return wrapper
 
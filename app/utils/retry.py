@@ -12,18 +12,74 @@
 import asyncio
 import inspect
 import random
-from typing import Callable, Any, Optional, TypeVar, ParamSpec
+from functools import lru_cache
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    NamedTuple,
+    Optional,
+    ParamSpec,
+    TypeVar,
+)
 
 from app.core.logger import logger
-from app.core.config import get_config
-from app.core.exceptions import UpstreamException
+from app.core.config import config as app_config, get_config
 
 P = ParamSpec("P")
 T = TypeVar("T")
 
+# 零延迟重试时每隔多少次让出一次事件循环
+_ZERO_DELAY_YIELD_EVERY = 16
+
+_MISSING = object()
+
+
+class _RetrySnapshot(NamedTuple):
+    """全局重试配置快照"""
+
+    max_retry: int
+    retry_codes: frozenset[int]
+    backoff_base: float
+    backoff_factor: float
+    backoff_max: float
+    retry_budget: float
+
+
+@lru_cache(maxsize=1)
+def _load_retry_defaults(version: int) -> _RetrySnapshot:
+    """读取全局重试配置（按配置版本缓存）"""
+    return _RetrySnapshot(
+        max_retry=int(get_config("retry.max_retry")),
+        retry_codes=frozenset(get_config("retry.retry_status_codes") or ()),
+        backoff_base=float(get_config("retry.retry_backoff_base")),
+        backoff_factor=float(get_config("retry.retry_backoff_factor")),
+        backoff_max=float(get_config("retry.retry_backoff_max")),
+        retry_budget=float(get_config("retry.retry_budget")),
+    )
+
+
+def _retry_defaults() -> _RetrySnapshot:
+    """获取全局重试配置快照，配置重新加载或更新后自动失效"""
+    return _load_retry_defaults(app_config.version)
+
 
 class RetryConfig:
-    """重试配置"""
+    """
+    重试配置
+
+    创建后视为只读：默认实例会在多个重试调用间共享。
+    """
+
+    __slots__ = (
+        "max_retry",
+        "retry_codes",
+        "backoff_base",
+        "backoff_factor",
+        "backoff_max",
+        "retry_budget",
+        "_exp_caps",
+    )
 
     def __init__(
         self,
@@ -45,39 +101,48 @@ class RetryConfig:
             backoff_max: 单次重试最大延迟（秒，默认从配置读取）
             retry_budget: 总重试预算时间（秒，默认从配置读取）
         """
-        self.max_retry = (
-            max_retry if max_retry is not None else int(get_config("retry.max_retry"))
-        )
+        d = _retry_defaults()
+        self.max_retry = d.max_retry if max_retry is None else max_retry
         self.retry_codes = (
-            retry_codes
-            if retry_codes is not None
-            else get_config("retry.retry_status_codes")
-        )
-        self.backoff_base = (
-            backoff_base
-            if backoff_base is not None
-            else float(get_config("retry.retry_backoff_base"))
+            d.retry_codes if retry_codes is None else frozenset(retry_codes)
         )
+        self.backoff_base = d.backoff_base if backoff_base is None else backoff_base
         self.backoff_factor = (
-            backoff_factor
-            if backoff_factor is not None
-            else float(get_config("retry.retry_backoff_factor"))
+            d.backoff_factor if backoff_factor is None else backoff_factor
         )
-        self.backoff_max = (
-            backoff_max
-            if backoff_max is not None
-            else float(get_config("retry.retry_backoff_max"))
-        )
-        self.retry_budget = (
-            retry_budget
-            if retry_budget is not None
-            else float(get_config("retry.retry_budget"))
+        self.backoff_max = d.backoff_max if backoff_max is None else backoff_max
+        self.retry_budget = d.retry_budget if retry_budget is None else retry_budget
+
+        # 各次重试的指数退避上限（已按 backoff_max 截断），按 attempt 下标查表
+        base, factor, cap = self.backoff_base, self.backoff_factor, self.backoff_max
+        self._exp_caps = tuple(
+            min(base * (factor**i), cap) for i in range(self.max_retry + 2)
         )
 
 
+@lru_cache(maxsize=1)
+def _load_default_config(version: int) -> RetryConfig:
+    """构建共享的默认重试配置（按配置版本缓存）"""
+    return RetryConfig()
+
+
+def _default_config() -> RetryConfig:
+    """获取共享的默认重试配置实例"""
+    return _load_default_config(app_config.version)
+
+
 class RetryContext:
     """重试上下文，跟踪重试状态"""
 
+    __slots__ = (
+        "config",
+        "attempt",
+        "last_error",
+        "last_status",
+        "total_delay",
+        "_last_delay",
+    )
+
     def __init__(self, config: RetryConfig):
         """
         初始化重试上下文
@@ -146,20 +211,31 @@ class RetryContext:
             self._last_delay = delay
             return delay
 
+        config = self.config
+        backoff_max = config.backoff_max
+
         # 429 使用 decorrelated jitter
         if status_code == 429:
-            # decorrelated jitter: delay = random(base, last_delay * 3)
-            delay = random.uniform(self.config.backoff_base, self._last_delay * 3)
-            delay = min(delay, self.config.backoff_max)
+            # decorrelated jitter: delay = random(base, min(last_delay * 3, max))
+            base = config.backoff_base
+            hi = self._last_delay * 3
+            if hi > backoff_max:
+                hi = backoff_max
+            delay = base + (hi - base) * random.random()
+            if delay > backoff_max:
+                delay = backoff_max
             self._last_delay = delay
             return delay
 
         # 其他状态码使用指数退避 + full jitter
-        exp_delay = self.config.backoff_base * (
-            self.config.backoff_factor**self.attempt
-        )
-        delay = random.uniform(0, min(exp_delay, self.config.backoff_max))
-        return delay
+        caps = config._exp_caps
+        attempt = self.attempt
+        if attempt < len(caps):
+            cap = caps[attempt]
+        else:
+            exp_delay = config.backoff_base * (config.backoff_factor**attempt)
+            cap = exp_delay if exp_delay < backoff_max else backoff_max
+        return cap * random.random()
 
     def record_delay(self, delay: float):
         """
@@ -175,16 +251,17 @@ def extract_status_code(error: Exception) -> Optional[int]:
     """
     从异常中提取 HTTP 状态码
 
+    UpstreamException 使用构造时提取的 upstream_status，其余异常读取 status_code。
+
     Args:
         error: 异常对象
 
     Returns:
         HTTP 状态码，如果无法提取则返回 None
     """
-    if isinstance(error, UpstreamException):
-        if error.details and "status" in error.details:
-            return error.details["status"]
-        return getattr(error, "status_code", None)
+    status = getattr(error, "upstream_status", _MISSING)
+    if status is not _MISSING:
+        return status
     return getattr(error, "status_code", None)
 
 
@@ -198,30 +275,23 @@ def extract_retry_after(error: Exception) -> Optional[float]:
     Returns:
         Retry-After 值（秒），如果无法提取则返回 None
     """
-    if not isinstance(error, UpstreamException):
-        return None
+    return getattr(error, "retry_after", None)
 
-    details = error.details or {}
 
-    # 尝试从 details 获取
-    retry_after = details.get("retry_after")
-    if retry_after is not None:
-        try:
-            return float(retry_after)
-        except (ValueError, TypeError):
-            pass
+def _as_async_callback(
+    callback: Callable[..., Any],
+) -> Callable[..., Awaitable[Any]]:
+    """将同步回调包装为异步回调（异步函数原样返回）"""
+    if inspect.iscoroutinefunction(callback):
+        return callback
 
-    # 尝试从 headers 获取
-    headers = details.get("headers", {})
-    if isinstance(headers, dict):
-        retry_after = headers.get("Retry-After") or headers.get("retry-after")
-        if retry_after is not None:
-            try:
-                return float(retry_after)
-            except (ValueError, TypeError):
-                pass
+    async def wrapper(*args: Any) -> None:
+        # lambda / partial / 异步 __call__ 对象可能返回协程，需要等待
+        result = callback(*args)
+        if inspect.isawaitable(result):
+            await result
 
-    return None
+    return wrapper
 
 
 async def retry_async(
@@ -240,7 +310,8 @@ async def retry_async(
         *args: 函数参数
         config: 重试配置（默认使用全局配置）
         extract_status: 从异常提取状态码的函数（默认使用 extract_status_code）
-        on_retry: 重试回调函数 (attempt, status_code, error, delay)，可以是同步或异步
+        on_retry: 重试回调函数 (attempt, status_code, error, delay)，可以是同步或
+            异步函数；同步函数在首次失败时包装一次
         **kwargs: 函数关键字参数
 
     Returns:
@@ -255,8 +326,14 @@ async def retry_async(
         ...     pass
         >>> result = await retry_async(fetch_data)
     """
+    # 快速路径：首次调用成功时不创建重试上下文
+    try:
+        return await func(*args, **kwargs)
+    except Exception as e:
+        error = e
+
     if config is None:
-        config = RetryConfig()
+        config = _default_config()
 
     ctx = RetryContext(config)
 
@@ -264,76 +341,77 @@ async def retry_async(
     if extract_status is None:
         extract_status = extract_status_code
 
-    while ctx.attempt <= config.max_retry:
-        try:
-            result = await func(*args, **kwargs)
+    if on_retry is not None:
+        on_retry = _as_async_callback(on_retry)
 
-            # 记录成功日志
-            if ctx.attempt > 0:
-                logger.info(
-                    f"Retry succeeded after {ctx.attempt} attempts, "
-                    f"total delay: {ctx.total_delay:.2f}s"
-                )
+    while True:
+        # 提取状态码
+        status_code = extract_status(error)
 
-            return result
+        if status_code is None:
+            # 无法识别为可重试错误
+            logger.error(f"Non-retryable error: {error}")
+            raise error
 
-        except Exception as e:
-            # 提取状态码
-            status_code = extract_status(e)
-
-            if status_code is None:
-                # 无法识别为可重试错误
-                logger.error(f"Non-retryable error: {e}")
-                raise
-
-            # 记录错误
-            ctx.record_error(status_code, e)
-
-            # 检查是否应该重试
-            if ctx.should_retry(status_code):
-                # 提取 Retry-After
-                retry_after = extract_retry_after(e)
-
-                # 计算延迟
-                delay = ctx.calculate_delay(status_code, retry_after)
-
-                # 检查是否超出预算
-                if ctx.total_delay + delay > config.retry_budget:
-                    logger.warning(
-                        f"Retry budget exhausted: {ctx.total_delay:.2f}s + {delay:.2f}s > {config.retry_budget}s"
-                    )
-                    raise
-
-                ctx.record_delay(delay)
-
-                logger.warning(
-                    f"Retry {ctx.attempt}/{config.max_retry} for status {status_code}, "
-                    f"waiting {delay:.2f}s (total: {ctx.total_delay:.2f}s)"
-                    + (f", Retry-After: {retry_after}s" if retry_after else "")
+        # 记录错误
+        ctx.record_error(status_code, error)
+
+        # 检查是否应该重试
+        if not ctx.should_retry(status_code):
+            # 不可重试或重试预算耗尽
+            if status_code in config.retry_codes:
+                logger.error(
+                    f"Retry exhausted after {ctx.attempt} attempts, "
+                    f"last status: {status_code}, total delay: {ctx.total_delay:.2f}s"
                 )
+            else:
+                logger.error(f"Non-retryable status code: {status_code}")
 
-                # 执行回调
-                if on_retry:
-                    result = on_retry(ctx.attempt, status_code, e, delay)
-                    if inspect.isawaitable(result):
-                        await result
+            raise error
 
-                await asyncio.sleep(delay)
-                continue
-            else:
-                # 不可重试或重试预算耗尽
-                if status_code in config.retry_codes:
-                    logger.error(
-                        f"Retry exhausted after {ctx.attempt} attempts, "
-                        f"last status: {status_code}, total delay: {ctx.total_delay:.2f}s"
-                    )
-                else:
-                    logger.error(f"Non-retryable status code: {status_code}")
+        # 提取 Retry-After
+        retry_after = extract_retry_after(error)
 
-                raise
+        # 计算延迟
+        delay = ctx.calculate_delay(status_code, retry_after)
 
-    # 不应该到达这里
-    raise RuntimeError("Retry logic error")
+        # 检查是否超出预算
+        if ctx.total_delay + delay > config.retry_budget:
+            logger.warning(
+                f"Retry budget exhausted: {ctx.total_delay:.2f}s + {delay:.2f}s > {config.retry_budget}s"
+            )
+            raise error
+
+        ctx.record_delay(delay)
+
+        logger.warning(
+            f"Retry {ctx.attempt}/{config.max_retry} for status {status_code}, "
+            f"waiting {delay:.2f}s (total: {ctx.total_delay:.2f}s)"
+            + (f", Retry-After: {retry_after}s" if retry_after else "")
+        )
+
+        # 执行回调
+        if on_retry is not None:
+            await on_retry(ctx.attempt, status_code, error, delay)
+
+        if delay > 0:
+            await asyncio.sleep(delay)
+        elif ctx.attempt % _ZERO_DELAY_YIELD_EVERY == 0:
+            # 零延迟重试不必每次让出事件循环，但定期让出以保证公平
+            await asyncio.sleep(0)
+
+        try:
+            result = await func(*args, **kwargs)
+        except Exception as e:
+            error = e
+            continue
+
+        # 记录成功日志
+        logger.info(
+            f"Retry succeeded after {ctx.attempt} attempts, "
+            f"total delay: {ctx.total_delay:.2f}s"
+        )
+        return result
 
 
 def with_retry(
@@ -359,6 +437,10 @@ def with_retry(
         ...     pass
     """
 
+    # 同步回调在装饰时包装，避免每次调用重复判断
+    if on_retry is not None:
+        on_retry = _as_async_callback(on_retry)
+
     def decorator(func: Callable[P, T]) -> Callable[P, T]:
         async def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
             return await retry_async(
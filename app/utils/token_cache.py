@@ -2,18 +2,40 @@
 Token 选择 LRU 缓存
 
 为热点 Token 提供 LRU 缓存机制，减少 Token 池查询开销。
+
+单次 OrderedDict 操作在 GIL 下是原子的，但 get/put/失效涉及缓存、
+反向索引与命中计数的多步更新，因此公开方法统一持有一把线程锁；
+以下划线开头的内部方法假定调用方已持有该锁。
 """
 
+from collections import OrderedDict
 from typing import Optional, Set
+import threading
 import time
 
 from app.core.logger import logger
 from app.services.token.models import EffortType
 
+# 永不过期的截止时间
+_NEVER = float("inf")
+
+# EffortType -> 枚举值，字典查找比每次访问 Enum.value 属性更快
+_EFFORT_VAL = {effort: effort.value for effort in EffortType}
+
 
 class TokenCache:
     """Token 缓存管理器"""
 
+    __slots__ = (
+        "max_size",
+        "ttl_seconds",
+        "_cache",
+        "_token_index",
+        "_lock",
+        "_hits",
+        "_misses",
+    )
+
     def __init__(self, max_size: int = 100, ttl_seconds: float = 60.0):
         """
         初始化 Token 缓存
@@ -24,10 +46,11 @@ class TokenCache:
         """
         self.max_size = max_size
         self.ttl_seconds = ttl_seconds
-        self._cache: dict[
-            tuple, tuple[str, float]
-        ] = {}  # (pool_name, effort) -> (token, timestamp)
-        self._access_order: list[tuple] = []  # LRU 访问顺序
+        # (pool_name, effort) -> (token, expires_at)，尾部为最近访问
+        self._cache: OrderedDict[tuple, tuple[str, float]] = OrderedDict()
+        # token -> 缓存键集合（反向索引，用于按 token 失效）
+        self._token_index: dict[str, set[tuple]] = {}
+        self._lock = threading.Lock()
         self._hits = 0
         self._misses = 0
 
@@ -45,32 +68,32 @@ class TokenCache:
         Returns:
             Token 字符串，如果未命中则返回 None
         """
-        key = (pool_name, effort.value)
+        key = (pool_name, _EFFORT_VAL[effort])
 
-        if key not in self._cache:
-            self._misses += 1
-            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
 
-        token, timestamp = self._cache[key]
+            token, expires_at = entry
 
-        # 检查 TTL
-        if time.monotonic() - timestamp > self.ttl_seconds:
-            self._remove(key)
-            self._misses += 1
-            return None
+            # 检查 TTL（永不过期时不读取时钟）
+            if expires_at != _NEVER and time.monotonic() > expires_at:
+                self._remove(key)
+                self._misses += 1
+                return None
 
-        # 检查是否在排除列表中
-        if exclude and token in exclude:
-            self._misses += 1
-            return None
+            # 检查是否在排除列表中
+            if exclude and token in exclude:
+                self._misses += 1
+                return None
 
-        # 更新访问顺序（移到最后）
-        if key in self._access_order:
-            self._access_order.remove(key)
-        self._access_order.append(key)
+            # 更新访问顺序（移到最后）
+            self._cache.move_to_end(key)
 
-        self._hits += 1
-        return token
+            self._hits += 1
+            return token
 
     def put(self, pool_name: str, effort: EffortType, token: str):
         """
@@ -81,23 +104,27 @@ class TokenCache:
             effort: 努力类型
             token: Token 字符串
         """
-        key = (pool_name, effort.value)
-        timestamp = time.monotonic()
-
-        # 如果已存在，更新时间戳
-        if key in self._cache:
-            self._cache[key] = (token, timestamp)
-            if key in self._access_order:
-                self._access_order.remove(key)
-            self._access_order.append(key)
-            return
-
-        # 检查容量，LRU 淘汰
-        if len(self._cache) >= self.max_size:
-            self._evict_lru()
-
-        self._cache[key] = (token, timestamp)
-        self._access_order.append(key)
+        key = (pool_name, _EFFORT_VAL[effort])
+        ttl = self.ttl_seconds
+        expires_at = _NEVER if ttl == _NEVER else time.monotonic() + ttl
+
+        with self._lock:
+            # 如果已存在，更新 token 与过期时间
+            entry = self._cache.get(key)
+            if entry is not None:
+                if entry[0] != token:
+                    self._unindex(entry[0], key)
+                    self._token_index.setdefault(token, set()).add(key)
+                self._cache[key] = (token, expires_at)
+                self._cache.move_to_end(key)
+                return
+
+            # 检查容量，LRU 淘汰
+            if len(self._cache) >= self.max_size:
+                self._evict_lru()
+
+            self._cache[key] = (token, expires_at)
+            self._token_index.setdefault(token, set()).add(key)
 
     def invalidate(self, token: str):
         """
@@ -106,13 +133,9 @@ class TokenCache:
         Args:
             token: Token 字符串
         """
-        keys_to_remove = []
-        for key, (cached_token, _) in self._cache.items():
-            if cached_token == token:
-                keys_to_remove.append(key)
-
-        for key in keys_to_remove:
-            self._remove(key)
+        with self._lock:
+            for key in list(self._token_index.get(token, ())):
+                self._remove(key)
 
     def invalidate_pool(self, pool_name: str):
         """
@@ -121,32 +144,39 @@ class TokenCache:
         Args:
             pool_name: Token 池名称
         """
-        keys_to_remove = [key for key in self._cache.keys() if key[0] == pool_name]
-        for key in keys_to_remove:
-            self._remove(key)
+        with self._lock:
+            keys_to_remove = [key for key in self._cache if key[0] == pool_name]
+            for key in keys_to_remove:
+                self._remove(key)
 
     def clear(self):
         """清空所有缓存"""
-        self._cache.clear()
-        self._access_order.clear()
-        self._hits = 0
-        self._misses = 0
+        with self._lock:
+            self._cache.clear()
+            self._token_index.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def _unindex(self, token: str, key: tuple):
+        """从反向索引中移除键"""
+        keys = self._token_index.get(token)
+        if keys is None:
+            return
+        keys.discard(key)
+        if not keys:
+            del self._token_index[token]
 
     def _remove(self, key: tuple):
         """移除缓存项"""
-        if key in self._cache:
-            del self._cache[key]
-        if key in self._access_order:
-            self._access_order.remove(key)
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._unindex(entry[0], key)
 
     def _evict_lru(self):
         """淘汰最久未使用的缓存项"""
-        if not self._access_order:
-            return
-
-        lru_key = self._access_order.pop(0)
-        if lru_key in self._cache:
-            del self._cache[lru_key]
+        if self._cache:
+            key, (token, _) = self._cache.popitem(last=False)
+            self._unindex(token, key)
 
     def get_stats(self) -> dict:
         """
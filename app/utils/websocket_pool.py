@@ -6,11 +6,39 @@ WebSocket 连接池
 
 import asyncio
 import time
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+from collections import OrderedDict
+from typing import Optional, Any
+from dataclasses import dataclass, field
 from enum import Enum
 
 from app.core.logger import logger
+from app.core.exceptions import AppException, ErrorType
+
+
+# 键锁分段数（需为 2 的幂）
+_LOCK_STRIPES = 16
+
+# 永不过期的截止时间（纳秒）
+_NEVER_NS = (1 << 63) - 1
+
+
+def _seconds_to_ns(seconds: float) -> int:
+    """秒转换为纳秒（无穷大视为永不过期）"""
+    if seconds == float("inf"):
+        return _NEVER_NS
+    return int(seconds * 1_000_000_000)
+
+
+class PoolTimeoutError(AppException):
+    """等待连接池名额超时"""
+
+    def __init__(self, message: str = "Timed out waiting for a WebSocket pool slot"):
+        super().__init__(
+            message=message,
+            error_type=ErrorType.SERVICE_UNAVAILABLE.value,
+            code="websocket_pool_timeout",
+            status_code=503,
+        )
 
 
 class ConnectionState(Enum):
@@ -21,21 +49,46 @@ class ConnectionState(Enum):
     CLOSED = "closed"  # 已关闭
 
 
-@dataclass
+@dataclass(slots=True)
 class PooledConnection:
-    """池化连接"""
+    """池化连接（时间均为 time.monotonic_ns() 整数纳秒）"""
 
     connection: Any  # WebSocket 连接对象
     state: ConnectionState = ConnectionState.IDLE
-    created_at: float = 0.0
-    last_used_at: float = 0.0
+    created_at_ns: int = 0
+    last_used_at_ns: int = 0
+    expires_at_ns: int = _NEVER_NS  # 生命周期截止时间，由连接池在创建时设置
     use_count: int = 0
+    # 连接能力标记，创建时探测一次，避免每次检查都调用 hasattr
+    has_ping: bool = field(default=False, init=False)
+    has_close: bool = field(default=False, init=False)
+    # 连接是否提供布尔 closed 属性（aiohttp / websockets 等）
+    has_closed_flag: bool = field(default=False, init=False)
 
     def __post_init__(self):
-        if self.created_at == 0.0:
-            self.created_at = time.monotonic()
-        if self.last_used_at == 0.0:
-            self.last_used_at = self.created_at
+        self.has_ping = callable(getattr(self.connection, "ping", None))
+        self.has_close = callable(getattr(self.connection, "close", None))
+        self.has_closed_flag = isinstance(
+            getattr(self.connection, "closed", None), bool
+        )
+        if self.created_at_ns == 0:
+            self.created_at_ns = time.monotonic_ns()
+        if self.last_used_at_ns == 0:
+            self.last_used_at_ns = self.created_at_ns
+
+    @property
+    def created_at(self) -> float:
+        """创建时间（time.monotonic() 秒，兼容旧字段）"""
+        return self.created_at_ns / 1_000_000_000
+
+    @property
+    def last_used_at(self) -> float:
+        """最近使用时间（time.monotonic() 秒，兼容旧字段）"""
+        return self.last_used_at_ns / 1_000_000_000
+
+    def is_dead(self) -> bool:
+        """底层连接是否已被对端或库关闭"""
+        return self.has_closed_flag and self.connection.closed
 
 
 class WebSocketPool:
@@ -61,9 +114,23 @@ class WebSocketPool:
         self.max_idle_time = max_idle_time
         self.max_lifetime = max_lifetime
         self.health_check_interval = health_check_interval
-
-        self._pool: Dict[str, PooledConnection] = {}
-        self._lock = asyncio.Lock()
+        # 超时阈值预先换算为纳秒，热路径只做整数比较
+        self._max_idle_ns = _seconds_to_ns(max_idle_time)
+        self._max_lifetime_ns = _seconds_to_ns(max_lifetime)
+
+        # 按最近使用时间排序（头部最久未使用），清理时可提前结束扫描
+        self._pool: OrderedDict[str, PooledConnection] = OrderedDict()
+        # 按键分段加锁，不同键的 acquire/release 互不阻塞；
+        # 清理与健康检查使用全局锁，彼此串行
+        self._locks = [asyncio.Lock() for _ in range(_LOCK_STRIPES)]
+        self._global_lock = asyncio.Lock()
+        # 容量名额：池内每个连接及创建中的连接各占一个，连接移出池时归还
+        self._sem = asyncio.Semaphore(max_size)
+        # 名额归还或连接转为空闲时置位，唤醒等待名额的 acquire 重新清理/淘汰
+        self._slot_event = asyncio.Event()
+        # 池内各状态连接数，随状态变化维护，get_stats 无需遍历
+        self._active_count = 0
+        self._idle_count = 0
         self._health_check_task: Optional[asyncio.Task] = None
         self._closed = False
 
@@ -95,10 +162,11 @@ class WebSocketPool:
             self._health_check_task = None
 
         # 关闭所有连接
-        async with self._lock:
-            for key, pooled in list(self._pool.items()):
+        async with self._global_lock:
+            while self._pool:
+                _, pooled = self._pool.popitem(last=False)
+                self._uncount(pooled)
                 await self._close_connection(pooled)
-                del self._pool[key]
 
         logger.info("WebSocket pool stopped")
 
@@ -107,72 +175,71 @@ class WebSocketPool:
         key: str,
         factory: callable,
         *args,
+        acquire_timeout: Optional[float] = None,
         **kwargs,
     ) -> Any:
         """
         获取连接
 
+        优先复用同键空闲连接；需要新建时先占用一个容量名额，池满时依次
+        清理过期连接、淘汰最久未使用的空闲连接，仍无名额则等待其他连接被归还或移除。
+
         Args:
             key: 连接键（用于标识连接，如 URL）
             factory: 连接工厂函数（用于创建新连接）
             *args: 工厂函数参数
+            acquire_timeout: 等待容量名额的超时时间（秒），None 表示一直等待
             **kwargs: 工厂函数关键字参数
 
         Returns:
             WebSocket 连接对象
+
+        Raises:
+            PoolTimeoutError: 等待容量名额超时
         """
         if self._closed:
             raise RuntimeError("WebSocket pool is closed")
 
-        async with self._lock:
-            # 尝试从池中获取空闲连接
-            if key in self._pool:
-                pooled = self._pool[key]
-
-                # 检查连接是否可用
-                if pooled.state == ConnectionState.IDLE:
-                    # 检查连接是否过期
-                    now = time.monotonic()
-                    if now - pooled.created_at > self.max_lifetime:
-                        logger.debug(f"Connection expired: {key}")
-                        await self._close_connection(pooled)
-                        del self._pool[key]
-                    elif now - pooled.last_used_at > self.max_idle_time:
-                        logger.debug(f"Connection idle timeout: {key}")
-                        await self._close_connection(pooled)
-                        del self._pool[key]
-                    else:
-                        # 连接可用，复用
-                        pooled.state = ConnectionState.ACTIVE
-                        pooled.last_used_at = now
-                        pooled.use_count += 1
-                        self._stats["total_reused"] += 1
-                        logger.debug(
-                            f"Reusing connection: {key} (use_count={pooled.use_count})"
-                        )
-                        return pooled.connection
-
-            # 检查连接池是否已满
-            if len(self._pool) >= self.max_size:
-                # 尝试清理过期连接
-                await self._cleanup_expired()
-
-                # 如果仍然满，抛出异常
-                if len(self._pool) >= self.max_size:
-                    raise RuntimeError(
-                        f"WebSocket pool is full (max_size={self.max_size})"
-                    )
-
-            # 创建新连接
-            connection = await factory(*args, **kwargs)
-            pooled = PooledConnection(
-                connection=connection,
-                state=ConnectionState.ACTIVE,
-            )
-            self._pool[key] = pooled
-            self._stats["total_created"] += 1
-            logger.debug(f"Created new connection: {key}")
-            return connection
+        async with self._lock_for(key):
+            connection = await self._try_reuse(key)
+            if connection is not None:
+                return connection
+
+        # 在键锁之外等待名额，避免阻塞同分段键的 release/remove
+        await self._reserve_slot(acquire_timeout)
+        inserted = False
+        try:
+            async with self._lock_for(key):
+                # 等待名额期间同键连接可能已被归还
+                connection = await self._try_reuse(key)
+                if connection is not None:
+                    return connection
+
+                if self._closed:
+                    raise RuntimeError("WebSocket pool is closed")
+
+                # 创建新连接
+                connection = await factory(*args, **kwargs)
+                now_ns = time.monotonic_ns()
+                pooled = PooledConnection(
+                    connection=connection,
+                    state=ConnectionState.ACTIVE,
+                    created_at_ns=now_ns,
+                    expires_at_ns=now_ns + self._max_lifetime_ns,
+                )
+                replaced = self._pool.get(key)
+                if replaced is not None:
+                    self._uncount(replaced)
+                self._pool[key] = pooled
+                inserted = True
+                self._active_count += 1
+                self._stats["total_created"] += 1
+                logger.debug(f"Created new connection: {key}")
+                return connection
+        finally:
+            # 未入池（复用、关闭或创建失败）时归还名额
+            if not inserted:
+                self._free_slot()
 
     async def release(self, key: str):
         """
@@ -181,11 +248,17 @@ class WebSocketPool:
         Args:
             key: 连接键
         """
-        async with self._lock:
-            if key in self._pool:
-                pooled = self._pool[key]
+        async with self._lock_for(key):
+            pooled = self._pool.get(key)
+            if pooled is not None:
+                if pooled.state == ConnectionState.ACTIVE:
+                    self._active_count -= 1
+                    self._idle_count += 1
                 pooled.state = ConnectionState.IDLE
-                pooled.last_used_at = time.monotonic()
+                pooled.last_used_at_ns = time.monotonic_ns()
+                self._pool.move_to_end(key)
+                # 空闲连接可被淘汰，唤醒等待名额的 acquire
+                self._slot_event.set()
                 logger.debug(f"Released connection: {key}")
 
     async def remove(self, key: str):
@@ -195,17 +268,139 @@ class WebSocketPool:
         Args:
             key: 连接键
         """
-        async with self._lock:
-            if key in self._pool:
-                pooled = self._pool[key]
+        async with self._lock_for(key):
+            pooled = self._pool.pop(key, None)
+            if pooled is not None:
+                self._uncount(pooled)
                 await self._close_connection(pooled)
-                del self._pool[key]
                 logger.debug(f"Removed connection: {key}")
 
+    async def _try_reuse(self, key: str) -> Any:
+        """
+        尝试复用同键空闲连接（调用方需持有键锁）
+
+        Returns:
+            可复用的连接对象，没有则返回 None（过期连接会被关闭）
+        """
+        pooled = self._pool.get(key)
+        if pooled is None or pooled.state != ConnectionState.IDLE:
+            return None
+
+        if pooled.is_dead():
+            logger.debug(f"Connection closed by peer: {key}")
+            self._detach(key)
+            await self._close_connection(pooled)
+            return None
+
+        # 检查连接是否过期
+        now_ns = time.monotonic_ns()
+        if now_ns > pooled.expires_at_ns:
+            logger.debug(f"Connection expired: {key}")
+            self._detach(key)
+            await self._close_connection(pooled)
+            return None
+        if now_ns - pooled.last_used_at_ns > self._max_idle_ns:
+            logger.debug(f"Connection idle timeout: {key}")
+            self._detach(key)
+            await self._close_connection(pooled)
+            return None
+
+        # 连接可用，复用
+        pooled.state = ConnectionState.ACTIVE
+        self._idle_count -= 1
+        self._active_count += 1
+        pooled.last_used_at_ns = now_ns
+        pooled.use_count += 1
+        self._pool.move_to_end(key)
+        self._stats["total_reused"] += 1
+        logger.debug(f"Reusing connection: {key} (use_count={pooled.use_count})")
+        return pooled.connection
+
+    async def _reserve_slot(self, timeout: Optional[float]):
+        """
+        占用一个容量名额
+
+        池满时先清理过期连接、淘汰空闲连接；仍无名额则等待名额归还或
+        有连接转为空闲，被唤醒后重新清理/淘汰，直到拿到名额或超时。
+        """
+        try:
+            async with asyncio.timeout(timeout):
+                while True:
+                    if self._sem.locked():
+                        async with self._global_lock:
+                            await self._cleanup_expired()
+                            if self._sem.locked():
+                                await self._evict_idle()
+
+                    # 名额未耗尽时 acquire 立即返回，不会挂起
+                    if not self._sem.locked():
+                        await self._sem.acquire()
+                        return
+
+                    self._slot_event.clear()
+                    await self._slot_event.wait()
+        except TimeoutError:
+            raise PoolTimeoutError(
+                f"Timed out waiting for a WebSocket pool slot (max_size={self.max_size})"
+            ) from None
+
+    async def _evict_idle(self):
+        """
+        为新连接腾出名额（调用方需持有全局锁）
+
+        优先回收底层已关闭的空闲连接；没有时淘汰最久未使用的空闲连接。
+        """
+        victims = [
+            (key, pooled)
+            for key, pooled in self._pool.items()
+            if pooled.state == ConnectionState.IDLE and pooled.is_dead()
+        ]
+        if not victims:
+            victim = next(
+                (
+                    (key, pooled)
+                    for key, pooled in self._pool.items()
+                    if pooled.state == ConnectionState.IDLE
+                ),
+                None,
+            )
+            if victim is None:
+                return
+            victims.append(victim)
+
+        for key, _ in victims:
+            self._detach(key)
+        for key, pooled in victims:
+            await self._close_connection(pooled)
+            logger.debug(f"Evicted idle connection: {key}")
+
+    def _uncount(self, pooled: PooledConnection):
+        """连接离开连接池时扣减状态计数并归还容量名额"""
+        if pooled.state == ConnectionState.ACTIVE:
+            self._active_count -= 1
+        elif pooled.state == ConnectionState.IDLE:
+            self._idle_count -= 1
+        self._free_slot()
+
+    def _free_slot(self):
+        """归还一个容量名额并唤醒等待者"""
+        self._sem.release()
+        self._slot_event.set()
+
+    def _detach(self, key: str) -> PooledConnection:
+        """从连接池中移出连接（不关闭）"""
+        pooled = self._pool.pop(key)
+        self._uncount(pooled)
+        return pooled
+
+    def _lock_for(self, key: str) -> asyncio.Lock:
+        """获取键所在分段的锁"""
+        return self._locks[hash(key) & (_LOCK_STRIPES - 1)]
+
     async def _close_connection(self, pooled: PooledConnection):
         """关闭连接"""
         try:
-            if hasattr(pooled.connection, "close"):
+            if pooled.has_close:
                 await pooled.connection.close()
             pooled.state = ConnectionState.CLOSED
             self._stats["total_closed"] += 1
@@ -213,8 +408,17 @@ class WebSocketPool:
             logger.warning(f"Failed to close connection: {e}")
 
     async def _cleanup_expired(self):
-        """清理过期连接"""
-        now = time.monotonic()
+        """
+        清理过期连接
+
+        _pool 按最近使用时间排序，遇到第一个未过期的空闲连接即停止扫描；
+        更靠后的连接最近使用过，超出生命周期的会在复用时被淘汰。
+
+        调用方需持有全局锁。连接先同步移出 _pool 再关闭，
+        避免关闭期间被其他键的 acquire 取用。
+        """
+        now_ns = time.monotonic_ns()
+        max_idle_ns = self._max_idle_ns
         keys_to_remove = []
 
         for key, pooled in self._pool.items():
@@ -222,15 +426,16 @@ class WebSocketPool:
                 continue
 
             # 检查是否过期
-            if now - pooled.created_at > self.max_lifetime:
+            if now_ns > pooled.expires_at_ns:
                 keys_to_remove.append(key)
-            elif now - pooled.last_used_at > self.max_idle_time:
+            elif now_ns - pooled.last_used_at_ns > max_idle_ns:
                 keys_to_remove.append(key)
+            else:
+                break
 
-        for key in keys_to_remove:
-            pooled = self._pool[key]
+        expired = [self._detach(key) for key in keys_to_remove]
+        for key, pooled in zip(keys_to_remove, expired):
             await self._close_connection(pooled)
-            del self._pool[key]
             logger.debug(f"Cleaned up expired connection: {key}")
 
     async def _health_check_loop(self):
@@ -245,30 +450,50 @@ class WebSocketPool:
                 logger.error(f"Health check error: {e}")
 
     async def _health_check(self):
-        """执行健康检查"""
-        async with self._lock:
-            keys_to_remove = []
+        """
+        执行健康检查
 
-            for key, pooled in self._pool.items():
-                if pooled.state != ConnectionState.IDLE:
-                    continue
+        对空闲连接的快照并发 ping，整轮最多耗时一个超时窗口；
+        ping 不持锁进行，剔除时重新加锁并校验连接未被替换或取用。
+        """
+        async with self._global_lock:
+            snapshot = [
+                (key, pooled)
+                for key, pooled in self._pool.items()
+                if pooled.state == ConnectionState.IDLE and pooled.has_ping
+            ]
+        if not snapshot:
+            return
+
+        async def _check(pooled: PooledConnection) -> Optional[Exception]:
+            """ping 单个连接，失败时返回异常（ping 同步抛错也不影响其他连接）"""
+            try:
+                await asyncio.wait_for(pooled.connection.ping(), timeout=5.0)
+            except Exception as e:
+                return e
+            return None
 
-                # 检查连接是否仍然有效
-                try:
-                    if hasattr(pooled.connection, "ping"):
-                        await asyncio.wait_for(
-                            pooled.connection.ping(),
-                            timeout=5.0,
-                        )
-                except Exception as e:
-                    logger.warning(f"Health check failed for {key}: {e}")
-                    keys_to_remove.append(key)
-                    self._stats["total_health_check_failures"] += 1
-
-            for key in keys_to_remove:
-                pooled = self._pool[key]
+        # 快照大小不超过 max_size，无需额外限制并发
+        results = await asyncio.gather(
+            *(_check(pooled) for _, pooled in snapshot),
+            return_exceptions=True,
+        )
+
+        async with self._global_lock:
+            for (key, pooled), result in zip(snapshot, results):
+                if not isinstance(result, Exception):
+                    continue
+                logger.warning(f"Health check failed for {key}: {result}")
+                self._stats["total_health_check_failures"] += 1
+
+                # 检查期间连接可能已被替换或取用
+                if (
+                    self._pool.get(key) is not pooled
+                    or pooled.state != ConnectionState.IDLE
+                ):
+                    continue
+                self._detach(key)
                 await self._close_connection(pooled)
-                del self._pool[key]
                 logger.debug(f"Removed unhealthy connection: {key}")
 
     def get_stats(self) -> dict:
@@ -278,18 +503,11 @@ class WebSocketPool:
         Returns:
             统计信息字典
         """
-        active_count = sum(
-            1 for p in self._pool.values() if p.state == ConnectionState.ACTIVE
-        )
-        idle_count = sum(
-            1 for p in self._pool.values() if p.state == ConnectionState.IDLE
-        )
-
         return {
             "size": len(self._pool),
             "max_size": self.max_size,
-            "active": active_count,
-            "idle": idle_count,
+            "active": self._active_count,
+            "idle": self._idle_count,
             "total_created": self._stats["total_created"],
             "total_reused": self._stats["total_reused"],
             "total_closed": self._stats["total_closed"],
@@ -342,6 +560,7 @@ def get_websocket_pool(
 __all__ = [
     "ConnectionState",
     "PooledConnection",
+    "PoolTimeoutError",
     "WebSocketPool",
     "get_websocket_pool",
 ]
@@ -4,9 +4,12 @@ Grok2API 应用入口
 FastAPI 应用初始化和路由注册
 """
 
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
+import asyncio
+import importlib.util
 import os
 import platform
+import shutil
 import sys
 from pathlib import Path
 
@@ -24,38 +27,123 @@ if env_file.exists():
     load_dotenv(env_file)
 
 from fastapi import FastAPI  # noqa: E402
-from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
-from fastapi import Depends  # noqa: E402
+from fastapi import APIRouter, Depends  # noqa: E402
 
-from app.core.auth import verify_api_key  # noqa: E402
-from app.core.config import get_config  # noqa: E402
+from app.core.auth import ApiKeyAsgiMiddleware, verify_api_key  # noqa: E402
+from app.core.config import config, get_config, register_defaults  # noqa: E402
 from app.core.logger import logger, setup_logging  # noqa: E402
 from app.core.exceptions import register_exception_handlers  # noqa: E402
-from app.core.response_middleware import ResponseLoggerMiddleware  # noqa: E402
+from app.core.fused_middleware import FusedCorsLoggingMiddleware  # noqa: E402
+from app.core.static_cache import CachedStatic  # noqa: E402
 from app.api.v1.chat import router as chat_router  # noqa: E402
 from app.api.v1.image import router as image_router  # noqa: E402
 from app.api.v1.files import router as files_router  # noqa: E402
 from app.api.v1.models import router as models_router  # noqa: E402
+from app.core.storage import StorageFactory  # noqa: E402
+from app.services.api_keys import api_key_manager  # noqa: E402
+from app.services.conversation_manager import conversation_manager  # noqa: E402
+from app.services.grok.defaults import get_grok_defaults  # noqa: E402
+from app.services.proxy_pool import proxy_pool  # noqa: E402
+from app.services.request_logger import request_logger  # noqa: E402
+from app.services.request_stats import request_stats  # noqa: E402
 from app.services.token import get_scheduler  # noqa: E402
-from app.services.mcp import create_mcp_http_app  # noqa: E402
 from app.api.v1.admin_api import router as admin_router  # noqa: E402
 from app.api.v1.public_api import router as public_router  # noqa: E402
 from app.api.pages import router as pages_router  # noqa: E402
-from fastapi.staticfiles import StaticFiles  # noqa: E402
+
+# 日志级别与 WebSocket 实现只解析一次，日志初始化与 uvicorn 共用
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").strip().upper() or "INFO"
+_WS_IMPLS = frozenset({"wsproto", "websockets", "websockets-sansio", "none"})
+
+
+def _validate_ws_impl(raw: str) -> str:
+    ws_impl = raw.strip().lower() or "wsproto"
+    if ws_impl not in _WS_IMPLS:
+        logger.warning(f"Invalid SERVER_WS_IMPL={ws_impl}, fallback to wsproto")
+        return "wsproto"
+    return ws_impl
+
+
+# gunicorn 模式下 worker 默认处理多少请求后回收
+DEFAULT_MAX_REQUESTS = 1000
+
+
+def _validate_max_requests(raw: str) -> int:
+    try:
+        max_requests = int(raw.strip())
+    except ValueError:
+        max_requests = -1
+    if max_requests < 0:
+        logger.warning(
+            f"Invalid SERVER_MAX_REQUESTS={raw}, fallback to {DEFAULT_MAX_REQUESTS}"
+        )
+        return DEFAULT_MAX_REQUESTS
+    return max_requests
+
 
 # 初始化日志
-setup_logging(
-    level=os.getenv("LOG_LEVEL", "INFO"), json_console=False, file_logging=True
-)
+setup_logging(level=LOG_LEVEL, json_console=False, file_logging=True)
+
+# 关闭阶段落盘/清理的总超时（秒）
+SHUTDOWN_TIMEOUT = 30.0
+
+
+def _mount_mcp(app: FastAPI):
+    """
+    按配置挂载 MCP 子应用
+
+    在 lifespan 中 config.load() 之后调用，mcp.enabled / mcp.mount_path 取用户配置；
+    环境变量 MCP_ENABLED 优先于配置。关闭时不导入 FastMCP，减少冷启动开销。
+    """
+    mcp_env = os.getenv("MCP_ENABLED")
+    if mcp_env is not None:
+        mcp_enabled = mcp_env.strip().lower() in {"1", "true", "yes", "on", "y"}
+    else:
+        mcp_enabled = bool(get_config("mcp.enabled", True))
+    if not mcp_enabled:
+        return
+
+    from app.services.mcp import create_mcp_http_app
+
+    mcp_http_app = create_mcp_http_app()
+    if mcp_http_app is None:
+        return
+    mount_path = str(get_config("mcp.mount_path", "/mcp") or "/mcp").strip()
+    if not mount_path.startswith("/"):
+        mount_path = f"/{mount_path}"
+    app.mount(mount_path, mcp_http_app, name="mcp")
+    app.state.mcp_http_app = mcp_http_app
+
+
+@asynccontextmanager
+async def _mcp_lifespan(app: FastAPI):
+    """MCP 子应用生命周期（启动或退出失败只记录日志，不影响主应用）"""
+    mcp_http_app = getattr(app.state, "mcp_http_app", None)
+    if mcp_http_app is None or not hasattr(mcp_http_app, "lifespan"):
+        yield
+        return
+
+    # 只拦截 MCP 上下文自身进入/退出的异常，运行期（yield）的异常照常向外传播
+    stack = AsyncExitStack()
+    try:
+        await stack.enter_async_context(mcp_http_app.lifespan(mcp_http_app))
+        logger.info("MCP streamable-http initialized")
+    except Exception as e:
+        logger.warning(f"MCP lifespan startup skipped: {e}")
+
+    try:
+        yield
+    finally:
+        try:
+            await stack.aclose()
+        except Exception as e:
+            logger.warning(f"MCP lifespan shutdown failed: {e}")
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
     # 1. 注册服务默认配置
-    from app.core.config import config, register_defaults
-    from app.services.grok.defaults import get_grok_defaults
-
     register_defaults(get_grok_defaults())
 
     # 2. 加载配置
@@ -88,29 +176,14 @@ async def lifespan(app: FastAPI):
     logger.info(f"Python: {sys.version.split()[0]}")
 
     # 3.1 初始化管理服务
-    from app.services.api_keys import api_key_manager
-    from app.services.request_stats import request_stats
-    from app.services.request_logger import request_logger
-    from app.services.conversation_manager import conversation_manager
-    from app.services.proxy_pool import proxy_pool
-
-    await api_key_manager.init()
-    await request_stats.init()
-    await request_logger.init()
-    await conversation_manager.init()
-    await proxy_pool.start()
-
-    # 3.2 初始化 MCP 子应用生命周期
-    mcp_lifespan_ctx = None
-    mcp_http_app = getattr(app.state, "mcp_http_app", None)
-    if mcp_http_app is not None and hasattr(mcp_http_app, "lifespan"):
-        try:
-            mcp_lifespan_ctx = mcp_http_app.lifespan(app)
-            await mcp_lifespan_ctx.__aenter__()
-            app.state.mcp_lifespan_ctx = mcp_lifespan_ctx
-            logger.info("MCP streamable-http initialized")
-        except Exception as e:
-            logger.warning(f"MCP lifespan startup skipped: {e}")
+    # 各服务初始化互不依赖，并发加载；代理池预热放到后台，不阻塞启动
+    await asyncio.gather(
+        api_key_manager.init(),
+        request_stats.init(),
+        request_logger.init(),
+        conversation_manager.init(),
+    )
+    app.state.proxy_task = asyncio.create_task(proxy_pool.start())
 
     # 4. 启动 Token 刷新调度器
     refresh_enabled = get_config("token.auto_refresh", True)
@@ -121,41 +194,86 @@ async def lifespan(app: FastAPI):
         scheduler = get_scheduler(interval)
         scheduler.start()
 
-    logger.info("Application startup complete.")
-    yield
+    # 5. 挂载 MCP 子应用，其生命周期包裹运行期，退出时先于落盘清理
+    _mount_mcp(app)
+    async with _mcp_lifespan(app):
+        logger.info("Application startup complete.")
+        yield
 
     # 关闭
     logger.info("Shutting down Grok2API...")
 
-    from app.core.storage import StorageFactory
-    from app.services.api_keys import api_key_manager
-    from app.services.request_stats import request_stats
-    from app.services.request_logger import request_logger
-    from app.services.conversation_manager import conversation_manager
-    from app.services.proxy_pool import proxy_pool
-
-    try:
-        await api_key_manager.flush()
-        await request_stats.flush()
-        await request_logger.flush()
-        await conversation_manager.shutdown()
-        await proxy_pool.stop()
-    except Exception:
-        pass
-
-    mcp_lifespan_ctx = getattr(app.state, "mcp_lifespan_ctx", None)
-    if mcp_lifespan_ctx is not None:
+    # 代理池预热尚未完成时直接取消；已失败的预热在此取回异常并记录
+    proxy_task = getattr(app.state, "proxy_task", None)
+    if proxy_task is not None:
+        if not proxy_task.done():
+            proxy_task.cancel()
         try:
-            await mcp_lifespan_ctx.__aexit__(None, None, None)
-        except Exception:
+            await proxy_task
+        except asyncio.CancelledError:
             pass
+        except Exception as e:
+            logger.warning(f"proxy_pool.start failed: {e!r}")
+
+    # 各项落盘/关闭并发执行，整体限时，避免单个慢操作拖住退出
+    shutdown_steps = (
+        ("api_key_manager.flush", api_key_manager.flush()),
+        ("request_stats.flush", request_stats.flush()),
+        ("request_logger.flush", request_logger.flush()),
+        ("conversation_manager.shutdown", conversation_manager.shutdown()),
+        ("proxy_pool.stop", proxy_pool.stop()),
+    )
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                *(step for _, step in shutdown_steps), return_exceptions=True
+            ),
+            timeout=SHUTDOWN_TIMEOUT,
+        )
+        for (name, _), result in zip(shutdown_steps, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Shutdown step {name} failed: {result!r}")
+    except TimeoutError:
+        logger.warning(
+            f"Shutdown flush timed out after {SHUTDOWN_TIMEOUT}s, forcing close"
+        )
 
     if StorageFactory._instance:
-        await StorageFactory._instance.close()
+        try:
+            await StorageFactory._instance.close()
+        except Exception as e:
+            logger.warning(f"storage close failed: {e!r}")
 
     if refresh_enabled:
-        scheduler = get_scheduler()
-        scheduler.stop()
+        try:
+            get_scheduler().stop()
+        except Exception as e:
+            logger.warning(f"scheduler stop failed: {e!r}")
+
+
+# OpenAI 兼容接口路由（挂在 /v1 父路由下，由 ApiKeyAsgiMiddleware 鉴权）
+_V1_ROUTERS = (chat_router, image_router, models_router)
+
+# 其余直接注册的路由：(路由, 前缀)；页面路由位于根路径，无法按前缀挂载
+_ROUTERS = (
+    (files_router, "/v1/files"),
+    (pages_router, ""),
+)
+
+# 管理与公共接口访问较少，挂载为子应用：热路径的路由表只包含 /v1 接口，
+# 子应用路由仅在前缀匹配时才参与匹配。(挂载路径, 路由, 名称)
+_SUB_APPS = (
+    ("/v1/admin", admin_router, "admin"),
+    ("/v1/public", public_router, "public"),
+)
+
+
+def _create_sub_app(router) -> FastAPI:
+    """创建挂载用子应用（共享异常处理，不单独暴露文档）"""
+    sub_app = FastAPI(docs_url=None, redoc_url=None, openapi_url=None)
+    register_exception_handlers(sub_app)
+    sub_app.include_router(router)
+    return sub_app
 
 
 def create_app() -> FastAPI:
@@ -165,8 +283,10 @@ def create_app() -> FastAPI:
         lifespan=lifespan,
     )
 
-    # CORS 配置
+    # 启动期配置一次性读取为局部变量
     allowed_origins = get_config("app.allowed_origins", [])
+
+    # CORS 配置
     if not allowed_origins:
         logger.warning(
             "SECURITY WARNING: No allowed_origins configured. "
@@ -179,50 +299,46 @@ def create_app() -> FastAPI:
             "http://127.0.0.1:8000",
         ]
 
+    # OpenAI 兼容接口共用一个父路由；依赖作为中间件之外的兜底鉴权
+    # （中间件已通过时直接复用结果），同时保留 OpenAPI 中的鉴权声明
+    v1_router = APIRouter(dependencies=[Depends(verify_api_key)])
+    for router in _V1_ROUTERS:
+        v1_router.include_router(router)
+
+    # 鉴权在 ASGI 层完成，失败请求不进入路由匹配与依赖解析；
+    # 先注册以位于 CORS/日志中间件内层，401 响应同样带 CORS 头并记录日志
     app.add_middleware(
-        CORSMiddleware,
-        allow_origins=allowed_origins,
-        allow_credentials=True,
+        ApiKeyAsgiMiddleware,
+        protected_paths=[
+            "/v1" + route.path for router in _V1_ROUTERS for route in router.routes
+        ],
+    )
+
+    # CORS、请求日志和 ID 融合中间件（Origin 集合在启动时固定）
+    app.state.allowed_origins = frozenset(allowed_origins)
+    app.add_middleware(
+        FusedCorsLoggingMiddleware,
+        allowed_origins=app.state.allowed_origins,
         allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
         allow_headers=["Content-Type", "Authorization"],
     )
 
-    # 请求日志和 ID 中间件
-    app.add_middleware(ResponseLoggerMiddleware)
-
     # 注册异常处理器
     register_exception_handlers(app)
 
-    # 注册路由
-    app.include_router(
-        chat_router, prefix="/v1", dependencies=[Depends(verify_api_key)]
-    )
-    app.include_router(
-        image_router, prefix="/v1", dependencies=[Depends(verify_api_key)]
-    )
-    app.include_router(
-        models_router, prefix="/v1", dependencies=[Depends(verify_api_key)]
-    )
-    app.include_router(files_router, prefix="/v1/files")
+    # 注册路由（各前缀互不重叠，注册顺序不影响匹配）
+    for router, prefix in ((v1_router, "/v1"), *_ROUTERS):
+        app.include_router(router, prefix=prefix)
+    for path, router, name in _SUB_APPS:
+        app.mount(path, _create_sub_app(router), name=name)
 
-    # 静态文件服务
+    # 静态文件服务（小文件启动时缓存到内存）
     static_dir = APP_DIR / "static"
     if static_dir.exists():
-        app.mount("/static", StaticFiles(directory=static_dir), name="static")
+        app.mount("/static", CachedStatic(static_dir), name="static")
 
-    # 注册管理与公共路由
-    app.include_router(admin_router, prefix="/v1/admin")
-    app.include_router(public_router, prefix="/v1/public")
-    app.include_router(pages_router)
-
-    mcp_http_app = create_mcp_http_app()
-    app.state.mcp_http_app = mcp_http_app
-    app.state.mcp_lifespan_ctx = None
-    if mcp_http_app is not None:
-        mount_path = str(get_config("mcp.mount_path", "/mcp") or "/mcp").strip()
-        if not mount_path.startswith("/"):
-            mount_path = f"/{mount_path}"
-        app.mount(mount_path, mcp_http_app, name="mcp")
+    # MCP 子应用依赖用户配置，在 lifespan 加载配置后挂载（见 _mount_mcp）
+    app.state.mcp_http_app = None
 
     return app
 
@@ -235,11 +351,14 @@ if __name__ == "__main__":
 
     host = os.getenv("SERVER_HOST", "0.0.0.0")
     port = int(os.getenv("SERVER_PORT", "8000"))
-    workers = int(os.getenv("SERVER_WORKERS", "1"))
 
     # 平台检查
     is_windows = platform.system() == "Windows"
 
+    # worker 数量：SERVER_WORKERS > WEB_CONCURRENCY > 1。
+    # 调度器、Token 池、会话等状态按进程独立，多 worker 需显式开启
+    workers = int(os.getenv("SERVER_WORKERS") or os.getenv("WEB_CONCURRENCY") or "1")
+
     # 自动降级
     if is_windows and workers > 1:
         logger.warning(
@@ -247,17 +366,78 @@ if __name__ == "__main__":
             "Using single worker instead."
         )
         workers = 1
-
-    ws_impl = os.getenv("SERVER_WS_IMPL", "wsproto").strip().lower() or "wsproto"
-    if ws_impl not in {"wsproto", "websockets", "websockets-sansio", "none"}:
-        logger.warning(f"Invalid SERVER_WS_IMPL={ws_impl}, fallback to wsproto")
-        ws_impl = "wsproto"
+    logger.info(f"Starting with {workers} worker(s)")
+
+    # 仅在主进程校验，避免每个 worker 导入时重复告警
+    WS_IMPL = _validate_ws_impl(os.getenv("SERVER_WS_IMPL", "wsproto"))
+
+    # 事件循环与 HTTP 解析器：优先 uvloop + httptools（C 扩展），
+    # Windows 或未安装时回退到 asyncio + h11（多 worker 时子进程内的导入错误无法捕获，需提前检查）。
+    # 两者为可选依赖，默认值回退只记 info；显式指定却未安装时才告警
+    loop_env = os.getenv("SERVER_LOOP", "").strip().lower()
+    loop_impl = loop_env or ("asyncio" if is_windows else "uvloop")
+    if loop_impl == "uvloop" and importlib.util.find_spec("uvloop") is None:
+        logger.log(
+            "WARNING" if loop_env else "INFO",
+            "uvloop not installed, fallback to asyncio event loop",
+        )
+        loop_impl = "asyncio"
+
+    http_env = os.getenv("SERVER_HTTP", "").strip().lower()
+    http_impl = http_env or ("h11" if is_windows else "httptools")
+    if http_impl == "httptools" and importlib.util.find_spec("httptools") is None:
+        logger.log(
+            "WARNING" if http_env else "INFO",
+            "httptools not installed, fallback to h11",
+        )
+        http_impl = "h11"
+
+    # 可选：多 worker 时交给 gunicorn 管理进程，支持按请求数回收 worker；
+    # --preload 在 fork 前导入应用，worker 间共享已加载的模块内存
+    use_gunicorn = os.getenv("SERVER_USE_GUNICORN", "").strip().lower() in {
+        "1",
+        "true",
+        "yes",
+    }
+    if use_gunicorn and not is_windows and workers > 1:
+        if shutil.which("gunicorn") is None:
+            logger.warning("gunicorn not installed, fallback to uvicorn workers")
+        else:
+            max_requests = _validate_max_requests(
+                os.getenv("SERVER_MAX_REQUESTS", str(DEFAULT_MAX_REQUESTS))
+            )
+            # 解析后的协议栈配置经环境变量传给 GrokUvicornWorker，与 uvicorn.run 一致
+            os.environ["SERVER_LOOP"] = loop_impl
+            os.environ["SERVER_HTTP"] = http_impl
+            os.environ["SERVER_WS_IMPL"] = WS_IMPL
+            os.execvp(
+                "gunicorn",
+                [
+                    "gunicorn",
+                    "main:app",
+                    "-k",
+                    "app.core.uvicorn_worker.GrokUvicornWorker",
+                    "-w",
+                    str(workers),
+                    "-b",
+                    f"{host}:{port}",
+                    "--max-requests",
+                    str(max_requests),
+                    "--max-requests-jitter",
+                    str(max(1, max_requests // 10)),
+                    "--log-level",
+                    LOG_LEVEL.lower(),
+                    "--preload",
+                ],
+            )
 
     uvicorn.run(
         "main:app",
         host=host,
         port=port,
         workers=workers,
-        log_level=os.getenv("LOG_LEVEL", "INFO").lower(),
-        ws=ws_impl,
+        log_level=LOG_LEVEL.lower(),
+        loop=loop_impl,
+        http=http_impl,
+        ws=WS_IMPL,
     )
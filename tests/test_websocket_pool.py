@@ -0,0 +1,54 @@
+"""
+WebSocketPool 回归测试
+
+运行：python -m unittest discover -s tests
+"""
+
+import asyncio
+import unittest
+
+from app.utils.websocket_pool import WebSocketPool
+
+
+class _FakeConnection:
+    """最小化的 WebSocket 连接替身"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+async def _factory(name: str) -> _FakeConnection:
+    return _FakeConnection(name)
+
+
+class WebSocketPoolSlotTest(unittest.IsolatedAsyncioTestCase):
+    async def test_release_wakes_waiter_blocked_on_full_pool(self):
+        """池满时等待名额的 acquire 应在其他连接归还后淘汰空闲连接并拿到名额"""
+        pool = WebSocketPool(max_size=1, max_idle_time=0.05)
+        conn_a = await pool.acquire("a", _factory, "a")
+
+        waiter = asyncio.create_task(pool.acquire("b", _factory, "b"))
+        await asyncio.sleep(0)
+        self.assertFalse(waiter.done())
+
+        await pool.release("a")
+        await asyncio.sleep(0.5)
+
+        self.assertTrue(waiter.done())
+        conn_b = await waiter
+        self.assertEqual(conn_b.name, "b")
+        self.assertTrue(conn_a.closed)
+
+        stats = pool.get_stats()
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["active"], 1)
+        self.assertEqual(stats["idle"], 0)
+        await pool.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()